@@ -0,0 +1,72 @@
+"""
+Copyright (C) 2025  WeaveFeed Development Team
+SPDX-License-Identifier: AGPL-3.0-or-later
+
+This file is part of WeaveFeed. See the LICENSE file in the project
+root for full license details.
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+from weavefeed_common.logging_consts import LOGGING_ASYNC_QUEUE_SIZE
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that never blocks the caller for low severity records.
+
+    When the queue is full, records below WARNING are discarded, whereas
+    WARNING and above wait for space so that errors are never lost.
+    """
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """
+        Enqueue a record, dropping it if the queue is full and the record is
+        not important enough to wait for.
+
+        Args:
+            record (logging.LogRecord): The prepared log record.
+        """
+        try:
+            self.queue.put_nowait(record)
+
+        except queue.Full:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record)
+
+
+def install_async_logging(
+        logger: logging.Logger) -> logging.handlers.QueueListener:
+    """
+    Move the handlers of a logger onto a background thread.
+
+    The logger's existing handlers are detached and replaced with a single
+    queue handler, so logging calls only pay for a queue put. A queue
+    listener thread then drains the queue and passes the records to the
+    original handlers, keeping any blocking I/O off the event loop.
+
+    Args:
+        logger (logging.Logger): Logger whose handlers should be made
+            asynchronous.
+
+    Returns:
+        logging.handlers.QueueListener: The started listener, it is stopped
+            automatically when the interpreter exits.
+    """
+    handlers = [handler for handler in logger.handlers
+                if not isinstance(handler, logging.handlers.QueueHandler)]
+
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=LOGGING_ASYNC_QUEUE_SIZE)
+    logger.addHandler(DroppingQueueHandler(log_queue))
+
+    listener = logging.handlers.QueueListener(log_queue,
+                                              *handlers,
+                                              respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    return listener
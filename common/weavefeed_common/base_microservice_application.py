@@ -14,13 +14,21 @@ import typing
 class BaseMicroserviceApplication(abc.ABC):
     """ Base microservice class. """
     __slots__ = ["_is_initialised", "_logger", "_shutdown_complete",
-                 "_shutdown_event"]
+                 "_shutdown_event", "_tick_interval"]
+
+    # Default number of seconds between main loop iterations, subclasses that
+    # need a faster cadence can override this.
+    DEFAULT_TICK_INTERVAL: float = 1.0
 
     def __init__(self):
         self._is_initialised: bool = False
+        self._tick_interval: float = self.DEFAULT_TICK_INTERVAL
         self._logger: typing.Optional[logging.Logger] = None
-        self._shutdown_event: asyncio.Event = asyncio.Event()
-        self._shutdown_complete: asyncio.Event = asyncio.Event()
+
+        # Created on first use so they are bound to the running event loop
+        # rather than whichever loop (if any) exists at construction time.
+        self._shutdown_event: typing.Optional[asyncio.Event] = None
+        self._shutdown_complete: typing.Optional[asyncio.Event] = None
 
     @property
     def logger(self) -> logging.Logger:
@@ -50,6 +58,8 @@ class BaseMicroserviceApplication(abc.ABC):
         This event should be awaited or checked by background tasks to
         gracefully stop operations when the application is shutting down.
         """
+        if self._shutdown_event is None:
+            self._shutdown_event = asyncio.Event()
         return self._shutdown_event
 
     @property
@@ -61,8 +71,30 @@ class BaseMicroserviceApplication(abc.ABC):
         finished, allowing other components (like the main app) to know when
         it's safe to exit.
         """
+        if self._shutdown_complete is None:
+            self._shutdown_complete = asyncio.Event()
         return self._shutdown_complete
 
+    @property
+    def tick_interval(self) -> float:
+        """
+        Property getter for the main loop tick interval.
+
+        returns:
+            Number of seconds the run loop waits between main loop iterations.
+        """
+        return self._tick_interval
+
+    @tick_interval.setter
+    def tick_interval(self, interval: float) -> None:
+        """
+        Property setter for the main loop tick interval.
+
+        parameters:
+            interval (float) : Number of seconds between main loop iterations.
+        """
+        self._tick_interval = interval
+
     async def initialise(self) -> bool:
         """
         Microservice initialisation.  It should return a boolean
@@ -91,17 +123,36 @@ class BaseMicroserviceApplication(abc.ABC):
 
         self._logger.info("Microservice starting main loop.")
 
+        # Start as if work was done, so the first iteration runs straight
+        # away instead of after a full tick.
+        did_work: bool = True
+
         try:
             while True:
-                if self.shutdown_event.is_set():
-                    break
-
-                await self._main_loop()
-                await asyncio.sleep(0.1)
+                if did_work:
+                    # The last iteration did real work so more is likely
+                    # pending, just yield to the event loop without arming a
+                    # timer before running again.
+                    await asyncio.sleep(0)
+                    if self.shutdown_event.is_set():
+                        break
+
+                else:
+                    # Idle, wake up either when shutdown is signalled or when
+                    # the tick interval elapses.
+                    try:
+                        await asyncio.wait_for(self.shutdown_event.wait(),
+                                               timeout=self._tick_interval)
+                        break
+
+                    except asyncio.TimeoutError:
+                        pass
+
+                did_work = await self._main_loop()
 
         except KeyboardInterrupt:
             self._logger.debug("Service: Keyboard interrupt received.")
-            self._shutdown_event.set()
+            self.shutdown_event.set()
 
         except asyncio.CancelledError:
             self._logger.debug("Service: Cancellation received.")
@@ -121,10 +172,10 @@ class BaseMicroserviceApplication(abc.ABC):
         self._logger.info("Stopping microservice...")
         self._logger.info('Waiting for microservice shutdown to complete')
 
-        self._shutdown_event.set()
+        self.shutdown_event.set()
 
         await self._shutdown()
-        self._shutdown_complete.set()
+        self.shutdown_complete.set()
 
         self._logger.info('Microservice shutdown complete...')
 
@@ -139,8 +190,14 @@ class BaseMicroserviceApplication(abc.ABC):
         return True
 
     @abc.abstractmethod
-    async def _main_loop(self) -> None:
-        """ Abstract method for main microservice loop. """
+    async def _main_loop(self) -> bool:
+        """
+        Abstract method for main microservice loop.
+
+        Returns:
+            Boolean: True if the iteration did work and the loop should run
+            again straight away, False to wait for the next tick.
+        """
 
     @abc.abstractmethod
     async def _shutdown(self):
@@ -6,6 +6,7 @@ This file is part of WeaveFeed. See the LICENSE file in the project
 root for full license details.
 """
 import configparser
+import functools
 import os
 import typing
 from weavefeed_common.configuration.configuration_setup import \
@@ -13,14 +14,36 @@ from weavefeed_common.configuration.configuration_setup import \
         ConfigurationSetup, \
         ConfigurationSetupItem
 
+# Accepted string representations of boolean configuration values
+BOOL_TRUE_VALUES = frozenset({"true", "1", "yes", "on"})
+BOOL_FALSE_VALUES = frozenset({"false", "0", "no", "off"})
+
+# Signature of the per-type configuration item readers, they are passed the
+# section, the item and the name of the environment variable overriding it.
+ItemReader = typing.Callable[[str, ConfigurationSetupItem, str], typing.Any]
+
+# A single step of the processing plan: (section, item, reader, env var name)
+PlanEntry = tuple[str, ConfigurationSetupItem, ItemReader, str]
+
+
+def _err(section: str, item_name: str, reason: str) -> ValueError:
+    """
+    Build the exception raised for an invalid configuration item, the message
+    is only formatted when a reader actually fails.
+    """
+    return ValueError(f"Config item '{section}::{item_name}' {reason}")
+
 
 class Configuration:
     """
     Class that wraps the functionality of configparser to support additional
     features such as trying multiple sources for the configuration item.
     """
+    __slots__ = ["_config_file", "_config_file_required", "_config_items",
+                 "_environ", "_has_config_file", "_layout", "_parser",
+                 "_plan", "_present", "_readers"]
 
-    def __init__(self):
+    def __init__(self) -> None:
         """ Constructor for the configuration class. """
 
         self._parser = configparser.ConfigParser()
@@ -29,17 +52,26 @@ class Configuration:
         self._config_file_required: bool = False
         self._layout: typing.Optional[ConfigurationSetup] = None
         self._config_items: dict[str, dict[str, typing.Any]] = {}
-
-        # Dispatch map: item type → handler function
-        self._readers: dict[ConfigItemDataType,
-                            typing.Callable[[str, ConfigurationSetupItem],
-                                            typing.Any]] = {
-            ConfigItemDataType.INT: self._read_int,
-            ConfigItemDataType.STRING: self._read_str,
-            ConfigItemDataType.BOOLEAN: self._read_bool,
-            ConfigItemDataType.FLOAT: self._read_float,
-            ConfigItemDataType.UNSIGNED_INT: self._read_uint,
-        }
+        self._environ = os.environ
+
+        # (section, option) pairs present in the config file, so lookups of
+        # missing items need no NoOptionError/NoSectionError round trip.
+        self._present: set[tuple[str, str]] = set()
+
+        # Flattened (section, item, reader, env var) list built from layout
+        self._plan: list[PlanEntry] = []
+
+        # Dispatch table: item type ordinal → handler function, the order
+        # must match the values of ConfigItemDataType.
+        self._readers: tuple[ItemReader, ...] = (
+            self._read_bool,    # ConfigItemDataType.BOOLEAN
+            self._read_float,   # ConfigItemDataType.FLOAT
+            # ConfigItemDataType.INT
+            functools.partial(self._read_int_bounded, minimum=None),
+            self._read_str,     # ConfigItemDataType.STRING
+            # ConfigItemDataType.UNSIGNED_INT
+            functools.partial(self._read_int_bounded, minimum=0),
+        )
 
     def configure(self,
                   layout: ConfigurationSetup,
@@ -56,11 +88,12 @@ class Configuration:
         if layout is None:
             raise ValueError("Configuration layout cannot be None.")
 
+        self._plan = self._build_plan(layout)
         self._config_file = config_file
         self._config_file_required = file_required
         self._layout = layout
 
-    def process_config(self):
+    def process_config(self) -> None:
         """
         Process the configuration
         """
@@ -84,10 +117,13 @@ class Configuration:
                 )
 
             self._has_config_file = bool(files_read)
+            self._present = {(section, option)
+                             for section in self._parser.sections()
+                             for option in self._parser.options(section)}
 
         self._read_configuration()
 
-    def get_entry(self, section: str, item: str) -> object:
+    def get_entry(self, section: str, item: str) -> typing.Any:
         """
         Get a parsed configuration value.
 
@@ -116,19 +152,18 @@ class Configuration:
             self,
             section: str,
             item: ConfigurationSetupItem,
+            env_var: str,
             file_getter: typing.Callable[[str, str], typing.Any]) -> typing.Any:
         """
         Get value from environment or config file.
-        Env var format: SECTION_ITEM (uppercased).
+        Env var format: SECTION_ITEM (uppercased), precomputed in the plan.
         """
-        env_var = f"{section}_{item.item_name}".upper()
-        value = os.getenv(env_var)
+        value = self._environ.get(env_var)
 
         if value is None and self._has_config_file:
-            try:
-                value = file_getter(section, item.item_name)
-            except (configparser.NoOptionError, configparser.NoSectionError):
-                value = None
+            option = self._parser.optionxform(item.item_name)
+            if (section, option) in self._present:
+                value = file_getter(section, option)
 
         return value if value is not None else item.default_value
 
@@ -137,8 +172,7 @@ class Configuration:
                          item: ConfigurationSetupItem,
                          value: typing.Any) -> typing.Any:
         if value is None and item.is_required:
-            raise ValueError(f"Missing required '{section}::"
-                             f"{item.item_name}'")
+            raise _err(section, item.item_name, "is required but missing")
         return value
 
     # -------------------------
@@ -147,41 +181,57 @@ class Configuration:
 
     def _read_str(self,
                   section: str,
-                  item: ConfigurationSetupItem) -> str:
-        value = self._lookup_value(section, item, self._parser.get)
+                  item: ConfigurationSetupItem,
+                  env_var: str) -> str:
+        value = self._lookup_value(section, item, env_var,
+                                   self._parser.get)
         value = self._ensure_required(section, item, value)
 
         if value is None:
             return value
 
         if item.valid_values and value not in item.valid_values:
-            raise ValueError(
-                f"Config '{section}::{item.item_name}' has invalid value "
-                f"'{value}', expected one of {item.valid_values}"
-            )
+            raise _err(section, item.item_name,
+                       f"has invalid value '{value}', expected one of "
+                       f"{item.valid_values}")
         return str(value)
 
-    def _read_int(self,
-                  section: str,
-                  item: ConfigurationSetupItem) -> typing.Optional[int]:
-        value = self._lookup_value(section, item, self._parser.getint)
+    def _read_int_bounded(self,
+                          section: str,
+                          item: ConfigurationSetupItem,
+                          env_var: str,
+                          minimum: typing.Optional[int]
+                          ) -> typing.Optional[int]:
+        """
+        Read an int item, optionally rejecting values below a minimum. Both
+        INT (no minimum) and UNSIGNED_INT (minimum of 0) items are read
+        through this single reader.
+        """
+        value = self._lookup_value(section, item, env_var,
+                                   self._parser.getint)
         value = self._ensure_required(section, item, value)
 
         if value is None:
             return None
 
         try:
-            return int(value)
+            value = int(value)
         except (ValueError, TypeError) as ex:
-            raise ValueError(
-                f"Config item '{section}::{item.item_name}' has invalid "
-                f"int '{value}'"
-            ) from ex
+            raise _err(section, item.item_name,
+                       f"has invalid int '{value}'") from ex
+
+        if minimum is not None and value < minimum:
+            kind = "unsigned int" if minimum == 0 else "int"
+            raise _err(section, item.item_name,
+                       f"has invalid {kind} '{value}', minimum is {minimum}")
+        return value
 
     def _read_bool(self,
                    section: str,
-                   item: ConfigurationSetupItem) -> typing.Optional[bool]:
-        value = self._lookup_value(section, item, self._parser.getboolean)
+                   item: ConfigurationSetupItem,
+                   env_var: str) -> typing.Optional[bool]:
+        value = self._lookup_value(section, item, env_var,
+                                   self._parser.getboolean)
         value = self._ensure_required(section, item, value)
 
         if value is None:
@@ -192,20 +242,20 @@ class Configuration:
 
         if isinstance(value, str):
             lowered = value.strip().lower()
-            if lowered in {"true", "1", "yes", "on"}:
+            if lowered in BOOL_TRUE_VALUES:
                 return True
-            if lowered in {"false", "0", "no", "off"}:
+            if lowered in BOOL_FALSE_VALUES:
                 return False
 
-        raise ValueError(
-            f"Config item '{section}::{item.item_name}' has invalid boolean "
-            f"'{value}'"
-        )
+        raise _err(section, item.item_name,
+                   f"has invalid boolean '{value}'")
 
     def _read_float(self,
                     section: str,
-                    item: ConfigurationSetupItem) -> typing.Optional[float]:
-        value = self._lookup_value(section, item, self._parser.getfloat)
+                    item: ConfigurationSetupItem,
+                    env_var: str) -> typing.Optional[float]:
+        value = self._lookup_value(section, item, env_var,
+                                   self._parser.getfloat)
         value = self._ensure_required(section, item, value)
 
         if value is None:
@@ -214,43 +264,39 @@ class Configuration:
         try:
             return float(value)
         except (ValueError, TypeError) as ex:
-            raise ValueError(
-                f"Config item '{section}::{item.item_name}' has invalid "
-                f"float '{value}'"
-            ) from ex
-
-    def _read_uint(self,
-                   section: str,
-                   item: ConfigurationSetupItem) -> typing.Optional[int]:
-        value = self._read_int(section, item)
-        if value is None:
-            return None
-        if value < 0:
-            raise ValueError(
-                f"Config item '{section}::{item.item_name}' has invalid "
-                f"unsigned int '{value}'"
-            )
-        return value
+            raise _err(section, item.item_name,
+                       f"has invalid float '{value}'") from ex
 
     # -------------------------
     # Main schema processor
     # -------------------------
 
+    def _build_plan(self, layout: ConfigurationSetup) -> list[PlanEntry]:
+        """
+        Flatten the layout into a list of (section, item, reader, env var)
+        entries so that processing the configuration needs no per-item
+        dispatch or environment variable name construction.
+
+        Raises:
+            ValueError: If an item has an unsupported type.
+        """
+        plan: list[PlanEntry] = []
+
+        for section_name, section_item in layout.iter_items():
+            if not isinstance(section_item.item_type, ConfigItemDataType):
+                raise _err(section_name, section_item.item_name,
+                           f"has unsupported type '{section_item.item_type}'")
+
+            reader = self._readers[section_item.item_type]
+            env_var = f"{section_name}_{section_item.item_name}".upper()
+            plan.append((section_name, section_item, reader, env_var))
+
+        return plan
+
     def _read_configuration(self) -> None:
-        for section_name in self._layout.get_sections():
-            section_items = self._layout.get_section(section_name)
-
-            for section_item in section_items:
-                reader = self._readers.get(section_item.item_type)
-                if not reader:
-                    raise ValueError(
-                        f"Config item has unsupported type "
-                        f"'{section_item.item_type}' "
-                        f"for '{section_name}::{section_item.item_name}'"
-                    )
-
-                value = reader(section_name, section_item)
-
-                if section_name not in self._config_items:
-                    self._config_items[section_name] = {}
-                self._config_items[section_name][section_item.item_name] = value
+        self._config_items = {section_name: {} for section_name
+                              in self._layout.get_sections()}
+
+        for section_name, section_item, reader, env_var in self._plan:
+            self._config_items[section_name][section_item.item_name] = \
+                reader(section_name, section_item, env_var)
@@ -10,13 +10,16 @@ import typing
 from dataclasses import dataclass
 
 
-class ConfigItemDataType(enum.Enum):
-    """ Enumeration for configuration item data type """
-    BOOLEAN = "bool"
-    FLOAT = "float"
-    INT = "int"
-    STRING = "string"
-    UNSIGNED_INT = "uint"
+class ConfigItemDataType(enum.IntEnum):
+    """
+    Enumeration for configuration item data type, the values are contiguous
+    ordinals so they can be used to index a table of readers.
+    """
+    BOOLEAN = 0
+    FLOAT = 1
+    INT = 2
+    STRING = 3
+    UNSIGNED_INT = 4
 
 
 @dataclass(frozen=True)
@@ -25,9 +28,9 @@ class ConfigurationSetupItem:
 
     item_name: str
     item_type: ConfigItemDataType
-    valid_values: typing.Optional[list] = None
+    valid_values: typing.Optional[list[typing.Any]] = None
     is_required: bool = False
-    default_value: typing.Optional[object] = None
+    default_value: typing.Optional[typing.Any] = None
 
 
 class ConfigurationSetup:
@@ -38,8 +41,11 @@ class ConfigurationSetup:
     contains a list of `ConfigurationSetupItem` instances describing individual
     configuration keys.
     """
+    __slots__ = ["_flat", "_items"]
 
-    def __init__(self, setup_items: dict) -> None:
+    def __init__(self,
+                 setup_items: dict[str, list[ConfigurationSetupItem]]
+                 ) -> None:
         """
         Initialize the ConfigurationSetup.
 
@@ -52,9 +58,15 @@ class ConfigurationSetup:
             raise TypeError("setup_items must be a dict[str, "
                             "list[ConfigurationSetupItem]]")
 
-        self._items = setup_items
+        self._items: dict[str, list[ConfigurationSetupItem]] = setup_items
 
-    def get_sections(self) -> list:
+        # The layout is immutable, so flatten it once into (section, item)
+        # pairs for consumers that walk every item.
+        self._flat: tuple[tuple[str, ConfigurationSetupItem], ...] = tuple(
+            (section, item) for section, items in setup_items.items()
+            for item in items)
+
+    def get_sections(self) -> list[str]:
         """
         Get a list of sections available.
 
@@ -75,3 +87,13 @@ class ConfigurationSetup:
             Returns an empty list if the section is not found.
         """
         return self._items.get(name, [])
+
+    def iter_items(self) -> typing.Iterable[tuple[str,
+                                                  ConfigurationSetupItem]]:
+        """
+        Get every configuration item in the layout, in section order.
+
+        Returns:
+            An iterable of (section name, ConfigurationSetupItem) pairs.
+        """
+        return self._flat
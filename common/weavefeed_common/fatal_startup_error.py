@@ -0,0 +1,19 @@
+"""
+Copyright (C) 2025  WeaveFeed Development Team
+SPDX-License-Identifier: AGPL-3.0-or-later
+
+This file is part of WeaveFeed. See the LICENSE file in the project
+root for full license details.
+"""
+
+
+class FatalStartupError(RuntimeError):
+    """
+    Raised when a microservice cannot start and should exit.
+
+    It derives from RuntimeError rather than SystemExit on purpose: Quart
+    turns an Exception raised by a ``before_serving`` hook into a failed
+    lifespan startup, which makes the ASGI server shut down in an orderly
+    way, whereas a SystemExit escapes Quart and uvicorn's ``auto`` lifespan
+    mode carries on serving.
+    """
@@ -10,3 +10,7 @@ import logging
 LOGGING_DATETIME_FORMAT_STRING = "%Y-%m-%d %H:%M:%S"
 LOGGING_DEFAULT_LOG_LEVEL = logging.DEBUG
 LOGGING_LOG_FORMAT_STRING = "%(asctime)s [%(levelname)s] %(message)s"
+
+# Maximum number of log records that can be waiting to be written by the
+# background logging thread, once full records below WARNING are dropped.
+LOGGING_ASYNC_QUEUE_SIZE = 10000
@@ -6,15 +6,20 @@ This file is part of WeaveFeed. See the LICENSE file in the project
 root for full license details.
 """
 import asyncio
+import logging
 import os
 import random
-from quart import g, Quart, request
+import typing
+from quart import Quart
+from weavefeed_common.fatal_startup_error import FatalStartupError
 from application import Application
+from json_provider import OrjsonProvider
+from api.auth_api_view import cancel_rehash_tasks
 import asyncpg
 
-
 # Quart application instance
 app = Quart(__name__)
+app.json = OrjsonProvider(app)
 
 SERVICE_APP: Application = Application(app)
 
@@ -44,6 +49,16 @@ class DatabaseConfig:
         DB_PORT (int): Database port number. Defaults to 5432 if
             the environment variable `WEAVEFEED_ACCOUNTS_DB_PORT`
             is not set.
+        DB_POOL_MIN (int): Number of connections the pool keeps open.
+            Defaults to 10 if the environment variable
+            `WEAVEFEED_ACCOUNTS_DB_POOL_MIN` is not set.
+        DB_POOL_MAX (int): Maximum number of pooled connections. Defaults
+            to 50 if the environment variable
+            `WEAVEFEED_ACCOUNTS_DB_POOL_MAX` is not set.
+        DB_ACQUIRE_TIMEOUT (float): Seconds a request waits for a pooled
+            connection before failing with a 503. Defaults to 2.0 if the
+            environment variable `WEAVEFEED_ACCOUNTS_DB_ACQUIRE_TIMEOUT`
+            is not set.
     """
     # pylint: disable=too-few-public-methods
     DB_USER = os.getenv("WEAVEFEED_ACCOUNTS_DB_USER", "__INVALID__")
@@ -51,31 +66,41 @@ class DatabaseConfig:
     DB_NAME = os.getenv("WEAVEFEED_ACCOUNTS_DB_NAME", "__INVALID__")
     DB_HOST = os.getenv("WEAVEFEED_ACCOUNTS_DB_HOST", "127.0.0.1")
     DB_PORT = int(os.getenv("WEAVEFEED_ACCOUNTS_DB_PORT", "5432"))
+    DB_POOL_MIN = int(os.getenv("WEAVEFEED_ACCOUNTS_DB_POOL_MIN", "10"))
+    DB_POOL_MAX = int(os.getenv("WEAVEFEED_ACCOUNTS_DB_POOL_MAX", "50"))
+    DB_ACQUIRE_TIMEOUT = float(
+        os.getenv("WEAVEFEED_ACCOUNTS_DB_ACQUIRE_TIMEOUT", "2.0"))
 
 
-async def cancel_background_tasks():
+async def cancel_background_tasks(timeout: float = 5.0):
     """
     Cancel and await the application's background task, if it exists.
 
     This function looks for a task stored on the global ``app`` object
     under the attribute ``background_task``. If found, it cancels the task
-    and safely awaits its termination. Any ``asyncio.CancelledError``
-    raised during cancellation is suppressed.
+    and waits up to ``timeout`` seconds for it to finish. A task that
+    ignores the cancellation is abandoned with a warning rather than
+    blocking shutdown indefinitely.
 
     This is typically called during application shutdown to ensure that
     background operations are gracefully stopped.
 
-    Raises:
-        asyncio.CancelledError: Only if the cancellation is not suppressed
-            (unexpected behavior).
+    Args:
+        timeout (float, optional): Seconds to wait for the task to finish
+            after cancelling it. Defaults to 5.0.
     """
     task = getattr(app, "background_task", None)
     if task:
         task.cancel()
-        try:
-            await task
-        except asyncio.CancelledError:
-            pass
+
+        # asyncio.wait() does not re-cancel or wait again on timeout, unlike
+        # asyncio.wait_for(), so the wait is strictly bounded.
+        _, pending = await asyncio.wait({task}, timeout=timeout)
+
+        if pending:
+            SERVICE_APP.logger.warning(
+                "Background task did not stop within %.1fs, abandoning it",
+                timeout)
 
 
 @app.before_serving
@@ -83,14 +108,24 @@ async def startup() -> None:
     """
     Code executed before Quart has begun serving http requests.
 
+    Raising here makes Quart report a failed lifespan startup, so the server
+    exits through its normal shutdown path and queued log records are
+    flushed.
+
     returns:
         None
+
+    Raises:
+        FatalStartupError: If the microservice failed to initialise or the
+            database pool could not be created.
     """
     if not await SERVICE_APP.initialise():
-        os._exit(1)
+        raise FatalStartupError("Accounts microservice failed to initialise")
 
     # clean, just call helper
-    app.db_pool = await create_db_pool(DatabaseConfig)
+    app.db_pool = await create_db_pool(DatabaseConfig,
+                                       logger=SERVICE_APP.logger)
+    app.db_acquire_timeout = DatabaseConfig.DB_ACQUIRE_TIMEOUT
 
     app.background_task = asyncio.create_task(SERVICE_APP.run())
 
@@ -108,74 +143,36 @@ async def shutdown() -> None:
     if app is not None:
         await cancel_background_tasks()
 
-    await app.db_pool.close()
-
-
-@app.before_request
-async def acquire_connection():
-    """
-    Acquire a database connection from the pool before handling a request.
-
-    This function is registered as a ``before_request`` hook in the Quart
-    application. For each incoming request, it attempts to acquire a database
-    connection from the application's connection pool and stores it in the
-    request context (``g.db``).
-
-    If the request handler's view function is marked with the ``_no_db``
-    attribute, the connection acquisition step is skipped. This allows
-    certain endpoints to run without requiring a database.
+    # Stop password rehashes before their pool goes away.
+    await cancel_rehash_tasks()
 
-    Returns:
-        dict | None: If acquiring a connection times out, returns a JSON error
-            response with a 503 status code. Otherwise, returns ``None`` to
-            continue request processing.
-    """
-    view_func = app.view_functions.get(request.endpoint)
-    if getattr(view_func, "_no_db", False):
-        return  # skip DB acquire
-
-    try:
-        g.db = await app.db_pool.acquire(timeout=2.0)
-
-    except asyncio.TimeoutError:
-        return {"error": "Service unavailable"}, 503
-
-
-@app.after_request
-async def release_connection(response):
-    """
-    Release the database connection back to the connection pool.
-
-    This function is registered as an ``after_request`` hook in the Quart
-    application. After each request, it checks for a database connection
-    stored in the ``g`` context (``g.db``). If a connection exists, it is
-    released back to the application's connection pool.
-
-    Args:
-        response (quart.wrappers.Response): The response object generated
-            by the request handler.
+    db_pool = getattr(app, "db_pool", None)
+    if db_pool is not None:
+        try:
+            await asyncio.wait_for(db_pool.close(), timeout=5.0)
 
-    Returns:
-        quart.wrappers.Response: The same response object, unchanged.
-    """
-    db = getattr(g, "db", None)
-    if db is not None:
-        await app.db_pool.release(db)
-    return response
+        except asyncio.TimeoutError:
+            SERVICE_APP.logger.warning(
+                "Database pool did not close within 5.0s, terminating it")
+            db_pool.terminate()
 
 
 async def create_db_pool(config,
                          retries: int=5,
-                         base_delay: float=1.0
+                         base_delay: float=1.0,
+                         max_delay: float=30.0,
+                         logger: typing.Optional[logging.Logger]=None
                          ) -> asyncpg.pool.Pool:
     """
     Create and return an asyncpg connection pool with retries and error
     handling.
 
     Attempts to create a database connection pool using the provided config.
-    Supports exponential backoff with jitter for retry-able errors. If the
-    pool cannot be created after the maximum number of retries, the application
-    will cancel background tasks and exit with a fatal error.
+    Supports capped exponential backoff with full jitter for retry-able
+    errors, so a fleet of restarting services does not retry in lockstep. If
+    the pool cannot be created after the maximum number of retries, the
+    application will cancel background tasks and raise, failing the service
+    startup.
 
     Args:
         config (DatabaseConfig): A configuration object containing database
@@ -184,13 +181,20 @@ async def create_db_pool(config,
             giving up. Defaults to 5.
         base_delay (float, optional): Base delay (in seconds) for exponential
             backoff. Defaults to 1.0.
+        max_delay (float, optional): Upper bound (in seconds) of the backoff
+            delay. Defaults to 30.0.
+        logger (logging.Logger, optional): Logger for progress and errors.
+            Defaults to the service application's logger.
 
     Returns:
         asyncpg.pool.Pool: A connection pool instance if successfully created.
 
     Raises:
-        SystemExit: If all retries are exhausted and a pool cannot be created.
+        FatalStartupError: If all retries are exhausted and a pool cannot be
+            created.
     """
+    logger = logger or SERVICE_APP.logger
+
     for attempt in range(1, retries + 1):
         try:
             pool = await asyncpg.create_pool(
@@ -199,57 +203,63 @@ async def create_db_pool(config,
                 database=config.DB_NAME,
                 host=config.DB_HOST,
                 port=config.DB_PORT,
-                min_size=1,
-                max_size=10,
-                timeout=5.0
+                min_size=config.DB_POOL_MIN,
+                max_size=config.DB_POOL_MAX,
+                timeout=5.0,
+                command_timeout=5.0,
+                statement_cache_size=1024,
+                max_cached_statement_lifetime=300,
+                max_inactive_connection_lifetime=300.0,
+                # Short OLTP queries never benefit from JIT compilation, but
+                # can pay for it on their first execution.
+                server_settings={
+                    "jit": "off",
+                    "application_name": "weavefeed-accounts",
+                }
             )
 
-            print(f"[INFO] Connected to database {config.DB_NAME} "
-                  f"on {config.DB_HOST}:{config.DB_PORT} (attempt {attempt})",
-                  flush=True)
+            logger.info("Connected to database %s on %s:%d (attempt %d)",
+                        config.DB_NAME, config.DB_HOST, config.DB_PORT,
+                        attempt)
 
             return pool
 
         except asyncpg.InvalidPasswordError:
-            print("[FATAL] Database authentication failed (check user/"
-                  "password).", flush=True)
+            logger.critical(
+                "Database authentication failed (check user/password).")
             break
 
         except asyncpg.InvalidCatalogNameError:
-            print(f"[FATAL] Database '{config.DB_NAME}' does not exist.",
-                  flush=True)
+            logger.critical("Database '%s' does not exist.", config.DB_NAME)
             break
 
         except asyncpg.CannotConnectNowError:
-            print("[FATAL] Database is starting up or cannot accept connections "
-                  "right now.", flush=True)
+            logger.critical(
+                "Database is starting up or cannot accept connections right "
+                "now.")
 
         except asyncio.TimeoutError:
-            print("[FATAL] Database connection timed out.", flush=True)
+            logger.critical("Database connection timed out.")
 
         except OSError as ex:
-            print(f"[FATAL] Database network/connection error: {ex}",
-                  flush=True)
+            logger.critical("Database network/connection error: %s", ex)
 
         except asyncpg.PostgresError as ex:
-            print(f"[FATAL] Database general Postgres error: {ex}", flush=True)
+            logger.critical("Database general Postgres error: %s", ex)
 
-        # Retry-able errors
-        delay = base_delay * (2 ** (attempt - 1))  # exponential backoff
-        jitter = random.uniform(0, 0.3 * delay)   # add jitter
-        wait_time = delay + jitter
+        # Retry-able errors, capped exponential backoff with full jitter
+        wait_time = random.uniform(
+            0, min(max_delay, base_delay * (2 ** (attempt - 1))))
 
         if attempt < retries:
-            print(f"[INFO] Retrying database connection in "
-                  f"{wait_time:.1f}s...", flush=True)
+            logger.info("Retrying database connection in %.1fs...", wait_time)
             await asyncio.sleep(wait_time)
             continue
 
-        print("[FATAL] All database retries exhausted. Could not connect!",
-              flush=True)
+        logger.critical("All database retries exhausted. Could not connect!")
         break
 
     if app is not None:
         await cancel_background_tasks()
 
-    os._exit(1)  # exit on failure
+    raise FatalStartupError("Could not create the accounts database pool")
@@ -11,7 +11,7 @@ import uuid
 
 from alembic import op
 import sqlalchemy as sa
-from passlib.hash import bcrypt
+import bcrypt
 
 
 # revision identifiers, used by Alembic.
@@ -75,7 +75,8 @@ def upgrade() -> None:
 
     # seed admin user
     admin_id = str(uuid.uuid4())
-    password_hash = bcrypt.hash("WeaveFeed_Admin")
+    password_hash = bcrypt.hashpw(b"WeaveFeed_Admin",
+                                  bcrypt.gensalt()).decode("ascii")
     now = datetime.utcnow()
 
     op.execute(
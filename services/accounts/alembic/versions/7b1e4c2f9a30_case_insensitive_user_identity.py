@@ -0,0 +1,39 @@
+"""case insensitive user identity
+
+Revision ID: 7b1e4c2f9a30
+Revises: 46c36e52c289
+Create Date: 2025-10-04 10:12:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b1e4c2f9a30'
+down_revision: Union[str, Sequence[str], None] = '46c36e52c289'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Lower-cased copy of the email maintained by Postgres, so email lookups
+    # and uniqueness are case-insensitive while still using a plain index.
+    op.add_column('users',
+                  sa.Column('email_lower', sa.String(length=255),
+                            sa.Computed('lower(email)', persisted=True),
+                            nullable=False))
+    op.create_index(op.f('ix_users_email_lower'), 'users', ['email_lower'],
+                    unique=True)
+    op.create_index('ix_users_username_lower', 'users',
+                    [sa.text('lower(username)')], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_username_lower', table_name='users')
+    op.drop_index(op.f('ix_users_email_lower'), table_name='users')
+    op.drop_column('users', 'email_lower')
@@ -0,0 +1,51 @@
+"""database side defaults
+
+Revision ID: c4d8a61e0f52
+Revises: 7b1e4c2f9a30
+Create Date: 2025-10-05 14:37:09.502871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d8a61e0f52'
+down_revision: Union[str, Sequence[str], None] = '7b1e4c2f9a30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables whose id and created_at/updated_at columns get database defaults.
+TABLES = ('users', 'auth_providers', 'user_profiles')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Ids and timestamps are generated by Postgres (gen_random_uuid() is
+    # built in from PostgreSQL 13), so inserts can leave them out.
+    for table in TABLES:
+        op.alter_column(table, 'id',
+                        existing_type=sa.UUID(),
+                        server_default=sa.text('gen_random_uuid()'))
+        op.alter_column(table, 'created_at',
+                        existing_type=sa.DateTime(timezone=True),
+                        server_default=sa.text('now()'))
+        op.alter_column(table, 'updated_at',
+                        existing_type=sa.DateTime(timezone=True),
+                        server_default=sa.text('now()'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.alter_column(table, 'updated_at',
+                        existing_type=sa.DateTime(timezone=True),
+                        server_default=None)
+        op.alter_column(table, 'created_at',
+                        existing_type=sa.DateTime(timezone=True),
+                        server_default=None)
+        op.alter_column(table, 'id',
+                        existing_type=sa.UUID(),
+                        server_default=None)
@@ -0,0 +1,39 @@
+"""timezone aware timestamps
+
+Revision ID: e5a3b7d91c28
+Revises: c4d8a61e0f52
+Create Date: 2025-10-06 09:21:54.730166
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a3b7d91c28'
+down_revision: Union[str, Sequence[str], None] = 'c4d8a61e0f52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Columns still stored as naive timestamps, the values in them are UTC.
+COLUMNS = (('users', 'last_login'), ('auth_providers', 'expires_at'))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column in COLUMNS:
+        op.alter_column(table, column,
+                        existing_type=sa.DateTime(),
+                        type_=sa.DateTime(timezone=True),
+                        postgresql_using=f"{column} AT TIME ZONE 'UTC'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in reversed(COLUMNS):
+        op.alter_column(table, column,
+                        existing_type=sa.DateTime(timezone=True),
+                        type_=sa.DateTime(),
+                        postgresql_using=f"{column} AT TIME ZONE 'UTC'")
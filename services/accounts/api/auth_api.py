@@ -8,6 +8,7 @@ root for full license details.
 import logging
 from quart import Blueprint
 from api.auth_api_view import AuthApiView
+from db_connection import with_db_connection
 
 
 def create_blueprint(logger: logging.Logger) -> Blueprint:
@@ -15,7 +16,9 @@ def create_blueprint(logger: logging.Logger) -> Blueprint:
     Creates and registers a Quart Blueprint for handling authentication.
 
     This function initializes a `View` object with the provided logger, and
-    then defines an API endpoints for authentication.
+    then registers the view's bound methods directly as the API endpoints
+    for authentication, so no wrapper coroutine sits between Quart and the
+    view.
 
     Args:
         logger (logging.Logger): A logger instance for logging messages.
@@ -27,18 +30,19 @@ def create_blueprint(logger: logging.Logger) -> Blueprint:
 
     blueprint = Blueprint('auth_api', __name__)
 
-    logger.debug("Registering Auth API routes:")
-
-    logger.debug("=> /auth/signup_password [POST]")
+    # (path, endpoint, methods, handler)
+    routes = (
+        ("/signup_password", "auth_signup_password_request", ["POST"],
+         view.signup_password),
+        ("/login_password", "auth_login_password_request", ["POST"],
+         view.login_password),
+    )
 
-    @blueprint.route("/signup_password", methods=["POST"])
-    async def auth_signup_password_request():
-        return await view.signup_password()
-
-    logger.debug("=> /auth/login_password [POST]")
+    logger.debug("Registering Auth API routes:")
 
-    @blueprint.route("/login_password", methods=["POST"])
-    async def auth_login_password_request():
-        return await view.login_password()
+    for path, endpoint, methods, handler in routes:
+        logger.debug("=> /auth%s [%s]", path, ", ".join(methods))
+        blueprint.add_url_rule(path, endpoint, with_db_connection(handler),
+                               methods=methods)
 
     return blueprint
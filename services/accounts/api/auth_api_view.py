@@ -5,15 +5,170 @@ SPDX-License-Identifier: AGPL-3.0-or-later
 This file is part of WeaveFeed. See the LICENSE file in the project
 root for full license details.
 """
-from datetime import datetime, timezone
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from http import HTTPStatus
 import logging
+import os
 import typing
 import uuid
-from passlib.hash import bcrypt
+import asyncpg
 from pydantic import BaseModel, EmailStr, ValidationError
 import quart
 from weavefeed_common.base_api_view import BaseApiView
+from db_connection import DB_ACQUIRE_TIMEOUT, breaker_is_open, current_db
+import password_hasher
+
+
+# bcrypt hash (cost 12) of a random throwaway password, verified against when
+# a login names an unknown user so that the response takes as long as for a
+# real account and cannot be used to enumerate usernames/emails.
+_DUMMY_HASH = "$2b$12$d8ttZ5dPMu.K74r5O89PG.gfm628EpADH2G6ytCG5iIFhwTdcG8ka"
+
+# bcrypt is deliberately slow, so hashing and verification run on their own
+# workers. A dedicated pool keeps them from queueing behind (or starving) any
+# other blocking work handed to the default executor. bcrypt releases the GIL
+# while hashing, so the threads do scale across cores.
+_HASH_WORKERS: int = os.cpu_count() or 1
+_HASH_POOL = ThreadPoolExecutor(max_workers=_HASH_WORKERS,
+                                thread_name_prefix="accounts-bcrypt")
+
+# Work factor used for new passwords while every hash worker is busy. Still
+# above the OWASP minimum, but a quarter of the CPU of the default, so a burst
+# of signups does not queue up behind bcrypt. Such hashes are upgraded the
+# next time the user logs in while the service is quiet.
+_BURST_HASH_ROUNDS: int = 10
+
+# Strong references to running background rehash tasks, asyncio itself only
+# keeps weak ones.
+_REHASH_TASKS: typing.Set[asyncio.Task] = set()
+
+# Username and placeholder email given to accounts created by Google signup.
+_GOOGLE_USERNAME_PREFIX: str = "google_"
+_GOOGLE_EMAIL_SUFFIX: str = "@googleuser.fake"
+
+# Constant error bodies, encoded once at import rather than re-serialised on
+# every failed request (the hot path when the endpoints are being hammered).
+_INVALID_CREDENTIALS_BODY: bytes = b'{"error":"Invalid credentials"}'
+_ACCOUNT_DISABLED_BODY: bytes = b'{"error":"Account disabled"}'
+_INVALID_JSON_BODY: bytes = b'{"error":"Invalid or missing JSON body"}'
+
+# --- SQL ---
+# Statements are module-level constants so every call passes asyncpg the same
+# query text, which is what its per-connection prepared statement cache is
+# keyed on. Never build these with f-strings or concatenation per call.
+# Row ids and created_at/updated_at are filled in by column defaults.
+_SQL_FIND_PROVIDER_LINK: str = \
+    "SELECT user_id FROM auth_providers WHERE provider=$1 AND provider_uid=$2"
+
+# Username and email are looked up in two branches so each can use its
+# unique index instead of an OR forcing a sequential scan. Both match
+# case-insensitively, as their uniqueness is: usernames via the lower(username)
+# index and emails via the generated email_lower column.
+_SQL_FIND_LOGIN_USER: str = """
+(SELECT id, username, email, password_hash, is_active, is_verified
+ FROM users
+ WHERE lower(username) = lower($1))
+UNION ALL
+(SELECT id, username, email, password_hash, is_active, is_verified
+ FROM users
+ WHERE email_lower = lower($1))
+LIMIT 1
+"""
+
+_SQL_UPDATE_LAST_LOGIN: str = "UPDATE users SET last_login=now() WHERE id=$1"
+
+# Only replaces the hash it was computed from, so a password changed while
+# the rehash ran is not overwritten with the old password's hash.
+_SQL_UPDATE_PASSWORD_HASH: str = \
+    "UPDATE users SET password_hash=$2, updated_at=now() " \
+    "WHERE id=$1 AND password_hash=$3"
+
+# The unconditional ON CONFLICT covers every unique index, including the
+# case-insensitive ones on email_lower and lower(username).
+_SQL_INSERT_USER: str = """
+INSERT INTO users(username, email, password_hash, is_active, is_verified)
+VALUES ($1, $2, $3, FALSE, $4)
+ON CONFLICT DO NOTHING
+RETURNING id
+"""
+
+_SQL_INSERT_PROVIDER: str = """
+INSERT INTO auth_providers
+(user_id, provider, provider_uid, access_token, refresh_token, expires_at)
+VALUES ($1, $2, $3, $4, $5, $6)
+"""
+
+_SQL_SIGNUP_OAUTH: str = """
+WITH new_user AS (
+    INSERT INTO users(username, email, password_hash, is_active, is_verified)
+    VALUES ($1, $2, NULL, FALSE, $3)
+    RETURNING id
+)
+INSERT INTO auth_providers
+(user_id, provider, provider_uid, access_token, refresh_token, expires_at)
+SELECT id, $4, $5, $6, $7, $8 FROM new_user
+RETURNING user_id
+"""
+
+
+async def cancel_rehash_tasks(timeout: float = 5.0) -> None:
+    """
+    Cancel background password rehashes that are still running.
+
+    Called on shutdown before the database pool is closed, so no rehash is
+    left holding, or waiting on, a connection from a closing pool. A
+    cancelled rehash is simply retried on the user's next login.
+
+    Args:
+        timeout (float, optional): Seconds to wait for the cancelled tasks
+            to finish. Defaults to 5.0.
+    """
+    tasks = set(_REHASH_TASKS)
+
+    if not tasks:
+        return
+
+    for task in tasks:
+        task.cancel()
+
+    await asyncio.wait(tasks, timeout=timeout)
+
+
+async def _run_in_hash_pool(func: typing.Callable[..., typing.Any],
+                            *args) -> typing.Any:
+    """
+    Run a blocking password hashing call on the bcrypt worker pool.
+
+    Args:
+        func (Callable): The blocking function to call.
+        *args: Positional arguments passed to ``func``.
+
+    Returns:
+        Any: The value returned by ``func``.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        _HASH_POOL, func, *args)
+
+
+def _error_response(body: bytes, status: HTTPStatus) \
+        -> typing.Tuple[quart.Response, HTTPStatus]:
+    """
+    Build an error response around a pre-serialised JSON body.
+
+    A new Response is created each time, as Quart updates the status and
+    headers of the object it is handed, so a shared instance is not safe.
+
+    Args:
+        body (bytes): Pre-encoded JSON error body.
+        status (HTTPStatus): HTTP status code of the response.
+
+    Returns:
+        tuple: (JSON response, HTTP status code)
+    """
+    return quart.Response(body, status=status,
+                          mimetype="application/json"), status
 
 
 # --- Request Models ---
@@ -51,6 +206,10 @@ class PasswordLoginRequest(BaseModel):
     """
     Request body schema for logging in with a password-based account.
 
+    This documents the body only, both fields are plain strings so
+    login_password checks them by hand instead of building a model on every
+    login.
+
     Attributes:
         username_or_email (str): Either the username or email of the user.
         password (str): The plaintext password provided by the user. This will
@@ -60,6 +219,31 @@ class PasswordLoginRequest(BaseModel):
     password: str
 
 
+class UserRow(typing.NamedTuple):
+    """
+    User account row returned by the login lookup.
+
+    Built once from the asyncpg Record so the login checks read fields by
+    attribute rather than by key, and do not depend on asyncpg's Record type.
+    The field order matches the columns selected by _SQL_FIND_LOGIN_USER.
+
+    Attributes:
+        id (uuid.UUID): Unique identifier of the user.
+        username (str): The user's username.
+        email (str): The user's email address.
+        password_hash (Optional[str]): Stored bcrypt hash, None for accounts
+            that only sign in through an external provider.
+        is_active (bool): Whether the account is enabled.
+        is_verified (bool): Whether the email address has been verified.
+    """
+    id: uuid.UUID
+    username: str
+    email: str
+    password_hash: typing.Optional[str]
+    is_active: bool
+    is_verified: bool
+
+
 class AuthApiView(BaseApiView):
     """
     API view handling user authentication and signup logic.
@@ -76,41 +260,43 @@ class AuthApiView(BaseApiView):
         """
         self._logger = logger.getChild(__name__)
 
+        # bcrypt jobs (hashes and verifications) running or queued on the
+        # hash pool, used to detect bursts.
+        self._inflight_hashes: int = 0
+
     async def signup_password(self):
         """
         Handle user signup with username, email, and password.
 
         - Validates input JSON against PasswordSignupRequest.
-        - Checks if username or email is already taken.
-        - Creates a new user record in the database if valid.
+        - Creates a new user record in the database if valid, unless the
+          username or email is already taken.
 
         Returns:
             tuple: (JSON response, HTTP status code)
         """
-        data = await quart.request.get_json()
+        # Parse and validate the raw body in one pass in pydantic's core
+        # rather than decoding to a dict first.
+        raw = await quart.request.get_data()
         try:
-            req = PasswordSignupRequest(**data)
+            req = PasswordSignupRequest.model_validate_json(raw)
 
         except ValidationError as ex:
             return quart.jsonify({"error": str(ex)}), HTTPStatus.BAD_REQUEST
 
-        # Check uniqueness
-        existing = await quart.g.db.fetchrow(
-            "SELECT id FROM users WHERE email=$1 OR username=$2",
-            req.email, req.username)
-
-        if existing:
-            return (quart.jsonify({"error": "User already exists"}),
-                    HTTPStatus.CONFLICT)
-
-        # Create user
+        # Create user, the insert itself reports a clash with an existing
+        # username or email rather than checking for one beforehand.
         user_id = await self._create_user(req.username,
                                           req.email,
                                           req.password)
 
+        if user_id is None:
+            return (quart.jsonify({"error": "User already exists"}),
+                    HTTPStatus.CONFLICT)
+
         return quart.jsonify({
             "message": "User created (password)",
-            "user_id": str(user_id),
+            "user_id": user_id,
             "username": req.username,
             "email": req.email,
         }), HTTPStatus.CREATED
@@ -123,27 +309,26 @@ class AuthApiView(BaseApiView):
         - Validates input JSON against OAuthSignupRequest.
         - Checks if the provider UID is already linked to a user.
         - Uses verified email if available, otherwise creates a placeholder.
-        - Creates a new user record without requiring a password.
+        - Creates a new user record without requiring a password, linked to
+          the provider.
 
         Returns:
             tuple: (JSON response, HTTP status code)
         """
-        data = await quart.request.get_json()
+        raw = await quart.request.get_data()
 
         try:
-            req = OAuthSignupRequest(**data)
+            req = OAuthSignupRequest.model_validate_json(raw)
 
         except ValidationError as ex:
             return quart.jsonify({"error": str(ex)}), \
                    HTTPStatus.BAD_REQUEST
 
         # Check if this provider UID already exists
-        existing = await quart.g.db.fetchrow(
-            ("SELECT user_id FROM auth_providers WHERE provider=$1 AND "
-             "provider_uid=$2"),
-            "google", req.provider_uid
+        existing = await current_db().fetchval(
+            _SQL_FIND_PROVIDER_LINK, "google", req.provider_uid
         )
-        if existing:
+        if existing is not None:
             return quart.jsonify({"error": "Account already linked"}), \
                 HTTPStatus.CONFLICT
 
@@ -156,14 +341,20 @@ class AuthApiView(BaseApiView):
             email_verified = True
         else:
             # Fallback to placeholder email
-            email = f"{req.provider_uid}@googleuser.fake"
+            email = req.provider_uid + _GOOGLE_EMAIL_SUFFIX
             email_verified = False
 
-        # Create a new user (no password for external auth)
-        user_id = await self._create_user(
-            username=f"google_{req.provider_uid}",
+        # Create a new user (no password for external auth) together with
+        # its provider link
+        user_id = await self._signup_oauth_atomic(
+            username=_GOOGLE_USERNAME_PREFIX + req.provider_uid,
             email=email,
             email_verified=email_verified,
+            provider="google",
+            provider_uid=req.provider_uid,
+            access_token=req.access_token,
+            refresh_token=req.refresh_token,
+            expires_at=req.expires_at,
         )
 
         return quart.jsonify({"user_id": user_id}), \
@@ -174,7 +365,8 @@ class AuthApiView(BaseApiView):
         Handle user login via username/email and password.
 
         Steps:
-            1. Parse and validate the request body against PasswordLoginRequest.
+            1. Parse the request body and check it has the PasswordLoginRequest
+               fields.
             2. Look up the user by username OR email in the database.
             3. Verify that the account is active and the password matches.
             4. Update the user's last_login timestamp.
@@ -187,86 +379,211 @@ class AuthApiView(BaseApiView):
                 - 401 Unauthorized: Invalid credentials.
                 - 403 Forbidden: Account disabled.
         """
-        data = await quart.request.get_json()
-
-        if not data:
-            return quart.jsonify({"error": "Invalid or missing JSON body"}), \
-                HTTPStatus.BAD_REQUEST
+        raw = await quart.request.get_data()
 
         try:
-            req = PasswordLoginRequest(**data)
-        except ValidationError as e:
-            return quart.jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+            data = quart.json.loads(raw) if raw else None
+        except ValueError:
+            data = None
 
-        # Find user by username OR email
-        user = await quart.g.db.fetchrow(
-            """
-            SELECT id, username, email, password_hash, is_active, is_verified
-            FROM users
-            WHERE username = $1 OR email = $1
-            """,
-            req.username_or_email,
-        )
+        if not isinstance(data, dict):
+            return _error_response(_INVALID_JSON_BODY, HTTPStatus.BAD_REQUEST)
 
-        if not user:
-            return quart.jsonify({"error": "Invalid credentials"}), \
-                HTTPStatus.UNAUTHORIZED
+        username_or_email = data.get("username_or_email")
+        password = data.get("password")
 
-        if not user["is_active"]:
-            return quart.jsonify({"error": "Account disabled"}), \
-                HTTPStatus.FORBIDDEN
+        if not isinstance(username_or_email, str) or \
+                not isinstance(password, str):
+            return quart.jsonify(
+                {"error": "Fields 'username_or_email' and 'password' must be "
+                          "provided as strings"}), HTTPStatus.BAD_REQUEST
 
-        if not user["password_hash"] or not bcrypt.verify(
-                req.password, user["password_hash"]):
-            return quart.jsonify({"error": "Invalid credentials"}), \
-                HTTPStatus.UNAUTHORIZED
+        # Find user by username OR email
+        row = await current_db().fetchrow(
+            _SQL_FIND_LOGIN_USER, username_or_email,
+        )
 
-        # Update last_login
-        await quart.g.db.execute(
-            "UPDATE users SET last_login=$1 WHERE id=$2",
-            datetime.utcnow(), user["id"]
+        if row is None:
+            await self._verify_password(password, _DUMMY_HASH)
+            return _error_response(_INVALID_CREDENTIALS_BODY,
+                                   HTTPStatus.UNAUTHORIZED)
+
+        user = UserRow(*row)
+
+        if not user.is_active:
+            return _error_response(_ACCOUNT_DISABLED_BODY,
+                                   HTTPStatus.FORBIDDEN)
+
+        # Verify off the event loop so it keeps serving other requests.
+        # Accounts with no password (external sign-in only) are checked
+        # against the dummy hash, so they take as long to reject as a wrong
+        # password and cannot be picked out by timing.
+        verified = await self._verify_password(
+            password, user.password_hash or _DUMMY_HASH)
+
+        if not verified or not user.password_hash:
+            return _error_response(_INVALID_CREDENTIALS_BODY,
+                                   HTTPStatus.UNAUTHORIZED)
+
+        # Update last_login. This stays a separate statement from the lookup
+        # above: folding it into an UPDATE ... RETURNING would stamp
+        # last_login before the password has been checked, recording failed
+        # attempts as logins.
+        await current_db().execute(
+            _SQL_UPDATE_LAST_LOGIN, user.id
         )
 
+        # Upgrade a hash created under burst load, but only while there is
+        # spare hashing capacity and the database is not failing.
+        if self._inflight_hashes < _HASH_WORKERS and \
+                not breaker_is_open() and \
+                password_hasher.needs_rehash(user.password_hash):
+            app = quart.current_app
+            self._schedule_rehash(
+                app.db_pool,
+                getattr(app, "db_acquire_timeout", DB_ACQUIRE_TIMEOUT),
+                user.id, user.password_hash, password)
+
         return quart.jsonify({
             "message": "Login successful",
-            "user_id": str(user["id"]),
-            "username": user["username"],
-            "email": user["email"],
-            "is_verified": user["is_verified"],
+            "user_id": user.id,
+            "username": user.username,
+            "email": user.email,
+            "is_verified": user.is_verified,
         }), HTTPStatus.OK
 
     async def _create_user(self,
                            username: str,
                            email: str,
                            password: typing.Optional[str] = None,
-                           email_verified: bool = False) -> uuid.UUID:
+                           email_verified: bool = False
+                           ) -> typing.Optional[uuid.UUID]:
         """
         Create a new user in the database.
 
+        The insert and the uniqueness check are one statement, so there is
+        no separate lookup round trip and no window for a concurrent signup
+        to take the username or email in between.
+
         Args:
             username (str): The username for the new account.
             email (str): The email address of the user.
             password (Optional[str]): If provided, will be securely hashed.
 
         Returns:
-            uuid.UUID: The unique identifier of the created user.
+            Optional[uuid.UUID]: The unique identifier of the created user,
+                or None if the username or email is already in use.
         """
-        user_id = uuid.uuid4()
         password_hash = None
 
         if password:
-            password_hash = bcrypt.hash(password)
-
-        await quart.g.db.execute(
-            """
-            INSERT INTO users(id, username, email, password_hash, is_active,
-                              is_verified, created_at, updated_at)
-            VALUES ($1, $2, $3, $4, FALSE, $5, $6, $6)
-            """,
-            user_id, username, email, password_hash, email_verified,
-            datetime.now(timezone.utc)
+            password_hash = await self._hash_password(password)
+
+        return await current_db().fetchval(
+            _SQL_INSERT_USER,
+            username, email, password_hash, email_verified
         )
-        return user_id
+
+    async def _hash_password(self,
+                             password: str,
+                             rounds: typing.Optional[int] = None) -> str:
+        """
+        Hash a password on the bcrypt worker pool.
+
+        Unless a work factor is given, the hash is created with the cheaper
+        burst work factor when every worker is already busy, to be upgraded
+        later by a login.
+
+        Args:
+            password (str): The plaintext password.
+            rounds (Optional[int]): bcrypt work factor to use instead of
+                picking one by load.
+
+        Returns:
+            str: The bcrypt hash of the password.
+        """
+        if rounds is None:
+            rounds = password_hasher.DEFAULT_ROUNDS \
+                if self._inflight_hashes < _HASH_WORKERS \
+                else _BURST_HASH_ROUNDS
+
+        self._inflight_hashes += 1
+
+        try:
+            return await _run_in_hash_pool(password_hasher.hash_password,
+                                           password, rounds)
+
+        finally:
+            self._inflight_hashes -= 1
+
+    async def _verify_password(self, password: str, password_hash: str) \
+            -> bool:
+        """
+        Check a password against a bcrypt hash on the bcrypt worker pool.
+
+        Verifications are counted with hashes, as they take the same
+        workers.
+
+        Args:
+            password (str): The plaintext password to check.
+            password_hash (str): The bcrypt hash to check it against.
+
+        Returns:
+            bool: True if the password matches the hash, else False.
+        """
+        self._inflight_hashes += 1
+
+        try:
+            return await _run_in_hash_pool(password_hasher.verify_password,
+                                           password, password_hash)
+
+        finally:
+            self._inflight_hashes -= 1
+
+    def _schedule_rehash(self,
+                         pool: asyncpg.pool.Pool,
+                         acquire_timeout: float,
+                         user_id: uuid.UUID,
+                         old_hash: str,
+                         password: str) -> None:
+        """
+        Re-hash a user's password at the default work factor in the
+        background, without delaying the login response.
+
+        The request's own connection is released when the handler returns,
+        so the task borrows its own from the pool. The task is tracked so
+        cancel_rehash_tasks() can stop it before the pool is closed.
+
+        Args:
+            pool (asyncpg.pool.Pool): Pool to borrow a connection from.
+            acquire_timeout (float): Seconds to wait for a free connection.
+            user_id (uuid.UUID): ID of the user to update.
+            old_hash (str): The stored hash being replaced.
+            password (str): The user's verified plaintext password.
+        """
+        async def rehash() -> None:
+            try:
+                # Always the default work factor, a burst hash written over
+                # a burst hash would be upgraded again on every login.
+                password_hash = await self._hash_password(
+                    password, password_hasher.DEFAULT_ROUNDS)
+
+                async with pool.acquire(timeout=acquire_timeout) \
+                        as connection:
+                    await connection.execute(_SQL_UPDATE_PASSWORD_HASH,
+                                             user_id, password_hash,
+                                             old_hash)
+
+            # Best effort, the next login tries again. Nothing awaits the
+            # task, so anything escaping would only be reported by asyncio
+            # as "Task exception was never retrieved".
+            except Exception as ex:  # pylint: disable=broad-exception-caught
+                self._logger.warning("Password rehash for user %s failed: %s",
+                                     user_id, ex)
+
+        task = asyncio.create_task(rehash())
+        _REHASH_TASKS.add(task)
+        task.add_done_callback(_REHASH_TASKS.discard)
 
     async def _create_auth_provider(self,
                                     user_id: uuid.UUID,
@@ -288,13 +605,47 @@ class AuthApiView(BaseApiView):
         """
         # pylint: disable=too-many-arguments, too-many-positional-arguments
 
-        await quart.g.db.execute(
-            """
-            INSERT INTO auth_providers
-            (id, user_id, provider, provider_uid, access_token, refresh_token,
-             expires_at, created_at, updated_at)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $8)
-            """,
-            uuid.uuid4(), user_id, provider, provider_uid, access_token,
-            refresh_token, expires_at, datetime.now(timezone.utc)
+        await current_db().execute(
+            _SQL_INSERT_PROVIDER,
+            user_id, provider, provider_uid, access_token, refresh_token,
+            expires_at
+        )
+
+    async def _signup_oauth_atomic(self,
+                                   username: str,
+                                   email: str,
+                                   email_verified: bool,
+                                   provider: str,
+                                   provider_uid: str,
+                                   access_token: str,
+                                   refresh_token: typing.Optional[str],
+                                   expires_at: typing.Optional[datetime]
+                                   ) -> uuid.UUID:
+        """
+        Create a user without a password and link it to an authentication
+        provider.
+
+        Both rows are inserted by a single statement, so this costs one round
+        trip and either both are created or neither is, never leaving a user
+        behind without its provider link.
+
+        Args:
+            username (str): The username for the new account.
+            email (str): The email address of the user.
+            email_verified (bool): Whether the provider verified the email.
+            provider (str): The provider name (e.g., "google").
+            provider_uid (str): The provider-specific unique ID.
+            access_token (str): OAuth access token.
+            refresh_token (Optional[str]): Optional refresh token.
+            expires_at (Optional[datetime]): Expiration time of the access token.
+
+        Returns:
+            uuid.UUID: The unique identifier of the created user.
+        """
+        # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+        return await current_db().fetchval(
+            _SQL_SIGNUP_OAUTH,
+            username, email, email_verified, provider, provider_uid,
+            access_token, refresh_token, expires_at
         )
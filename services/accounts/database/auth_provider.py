@@ -5,8 +5,8 @@ SPDX-License-Identifier: AGPL-3.0-or-later
 This file is part of WeaveFeed. See the LICENSE file in the project
 root for full license details.
 """
-import uuid
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, \
+    UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import UUID
 from .base import Base
 from .created_updated_timestamp_mixin import CreatedUpdatedTimestampMixin
@@ -23,6 +23,7 @@ class AuthProvider(CreatedUpdatedTimestampMixin, Base):
 
     Attributes:
         id (UUID): Primary key, unique identifier for the auth provider record.
+            Generated by the database.
         user_id (UUID): Foreign key reference to the associated user (`users.id`).
             Cascade delete ensures auth provider entries are removed if the user is deleted.
         provider (str): The name of the provider (e.g., "google").
@@ -42,7 +43,8 @@ class AuthProvider(CreatedUpdatedTimestampMixin, Base):
     # pylint: disable=too-few-public-methods
     __tablename__ = "auth_providers"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True,
+                server_default=text("gen_random_uuid()"))
     user_id = Column(UUID(as_uuid=True),
                      ForeignKey("users.id", ondelete="CASCADE"),
                      nullable=False)
@@ -50,7 +52,7 @@ class AuthProvider(CreatedUpdatedTimestampMixin, Base):
     provider_uid = Column(String(255), nullable=False) # unique provider ID
     access_token = Column(Text)
     refresh_token = Column(Text)
-    expires_at = Column(DateTime)
+    expires_at = Column(DateTime(timezone=True))
 
     __table_args__ = (
         UniqueConstraint("provider", "provider_uid", name="uq_provider_uid"),
@@ -5,8 +5,7 @@ SPDX-License-Identifier: AGPL-3.0-or-later
 This file is part of WeaveFeed. See the LICENSE file in the project
 root for full license details.
 """
-from datetime import datetime, timezone
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column, DateTime, func
 
 
 class CreatedUpdatedTimestampMixin:
@@ -14,7 +13,8 @@ class CreatedUpdatedTimestampMixin:
     SQLAlchemy mixin that adds standard timestamp fields to a model.
 
     Provides automatic tracking of record creation and last update times.
-    Both fields are stored as timezone-aware UTC datetimes.
+    Both fields are stored as timezone-aware UTC datetimes and default to the
+    database's now(), so inserts need not supply them.
 
     Attributes:
         created_at (datetime): Timestamp when the record was created.
@@ -26,9 +26,9 @@ class CreatedUpdatedTimestampMixin:
     """
     # pylint: disable=too-few-public-methods
     created_at = Column(DateTime(timezone=True),
-                        default=lambda: datetime.now(timezone.utc),
+                        server_default=func.now(),
                         nullable=False)
     updated_at = Column(DateTime(timezone=True),
-                        default=lambda: datetime.now(timezone.utc),
-                        onupdate=lambda: datetime.now(timezone.utc),
+                        server_default=func.now(),
+                        onupdate=func.now(),
                         nullable=False)
@@ -5,8 +5,8 @@ SPDX-License-Identifier: AGPL-3.0-or-later
 This file is part of WeaveFeed. See the LICENSE file in the project
 root for full license details.
 """
-import uuid
-from sqlalchemy import Column, String, Boolean, DateTime
+from sqlalchemy import Column, Computed, String, Boolean, DateTime, Index, \
+    func, text
 from sqlalchemy.dialects.postgresql import UUID
 from .base import Base
 from .created_updated_timestamp_mixin import CreatedUpdatedTimestampMixin
@@ -21,9 +21,12 @@ class User(CreatedUpdatedTimestampMixin, Base):
     stored in related tables.
 
     Attributes:
-        id (UUID): Primary key, unique identifier for the user.
+        id (UUID): Primary key, unique identifier for the user. Generated
+            by the database.
         username (str): Unique username for login or display.
         email (str): Unique email address of the user. Indexed for quick lookup.
+        email_lower (str): Lower-cased email, generated by the database.
+            Uniquely indexed so emails are unique regardless of case.
         password_hash (str): Securely hashed password. May be null if the
             user authenticates only through external providers.
         is_active (bool): Flag indicating whether the account is active.
@@ -39,10 +42,18 @@ class User(CreatedUpdatedTimestampMixin, Base):
     # pylint: disable=too-few-public-methods
     __tablename__ = "users"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True,
+                server_default=text("gen_random_uuid()"))
     username = Column(String(32), unique=True, nullable=False, index=True)
     email = Column(String(255), unique=True, nullable=False, index=True)
     password_hash = Column(String(128))  # nullable if only external auth
     is_active = Column(Boolean, default=True, nullable=False)
     is_verified = Column(Boolean, default=False, nullable=False)
-    last_login = Column(DateTime)
+    last_login = Column(DateTime(timezone=True))
+    email_lower = Column(String(255), Computed("lower(email)", persisted=True),
+                         nullable=False, index=True, unique=True)
+
+    __table_args__ = (
+        # Usernames are unique regardless of case.
+        Index("ix_users_username_lower", func.lower(username), unique=True),
+    )
@@ -5,8 +5,7 @@ SPDX-License-Identifier: AGPL-3.0-or-later
 This file is part of WeaveFeed. See the LICENSE file in the project
 root for full license details.
 """
-import uuid
-from sqlalchemy import Column, String, ForeignKey
+from sqlalchemy import Column, String, ForeignKey, text
 from sqlalchemy.dialects.postgresql import UUID
 from .base import Base
 from .created_updated_timestamp_mixin import CreatedUpdatedTimestampMixin
@@ -20,7 +19,8 @@ class UserProfile(CreatedUpdatedTimestampMixin, Base):
     optional display information along with audit timestamps.
 
     Attributes:
-        id (UUID): Primary key, unique identifier for the profile.
+        id (UUID): Primary key, unique identifier for the profile. Generated
+            by the database.
         user_id (UUID): Foreign key reference to the associated user
             (`users.id`). Enforced as unique so each user has at most
             one profile. Cascade delete ensures the profile is removed
@@ -35,7 +35,8 @@ class UserProfile(CreatedUpdatedTimestampMixin, Base):
     # pylint: disable=too-few-public-methods
     __tablename__ = "user_profiles"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True,
+                server_default=text("gen_random_uuid()"))
     user_id = Column(UUID(as_uuid=True),
                      ForeignKey("users.id", ondelete="CASCADE"),
                      unique=True, nullable=False)
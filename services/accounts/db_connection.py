@@ -0,0 +1,211 @@
+"""
+Copyright (C) 2025  WeaveFeed Development Team
+SPDX-License-Identifier: AGPL-3.0-or-later
+
+This file is part of WeaveFeed. See the LICENSE file in the project
+root for full license details.
+"""
+import asyncio
+import contextvars
+import functools
+from http import HTTPStatus
+import time
+import typing
+import asyncpg
+import quart
+
+# Seconds to wait for a free pooled connection before giving up, used when
+# the application does not set ``app.db_acquire_timeout``.
+DB_ACQUIRE_TIMEOUT: float = 2.0
+
+# Connection held by the route handler running in the current context.
+_DB_CV: contextvars.ContextVar[typing.Optional[asyncpg.Connection]] = \
+    contextvars.ContextVar("db", default=None)
+
+# Errors from pool.acquire() that mean the database could not be reached.
+# Anything else, such as the request being cancelled because the client went
+# away, says nothing about the database and is not counted against it.
+_ACQUIRE_FAILURES: typing.Tuple[typing.Type[BaseException], ...] = (
+    OSError, asyncpg.PostgresError, asyncpg.InterfaceError)
+
+# Body of the 503 response, encoded once rather than on every rejection.
+_SERVICE_UNAVAILABLE_BODY: bytes = b'{"error":"Service unavailable"}'
+
+
+class AcquireCircuitBreaker:
+    """
+    In-process circuit breaker guarding connection pool acquisition.
+
+    After ``threshold`` consecutive acquire failures the breaker opens and
+    requests are rejected straight away instead of each waiting for the
+    acquire timeout. Once ``cooldown`` seconds have passed a single request
+    is let through as a probe (half-open), its outcome either closes the
+    breaker again or re-opens it for another cooldown period.
+    """
+    __slots__ = ["_cooldown", "_failures", "_opened_at", "_probing",
+                 "_threshold"]
+
+    def __init__(self, threshold: int = 5, cooldown: float = 10.0) -> None:
+        self._threshold: int = threshold
+        self._cooldown: float = cooldown
+        self._failures: int = 0
+        self._opened_at: typing.Optional[float] = None
+        self._probing: bool = False
+
+    @property
+    def is_open(self) -> bool:
+        """
+        Property getter for whether the breaker is currently tripped.
+
+        returns:
+            True if the breaker is open or half-open, else False.
+        """
+        return self._opened_at is not None
+
+    def allow(self) -> bool:
+        """
+        Check whether a request may try to acquire a connection.
+
+        Returns:
+            bool: True if the breaker is closed, or if the cooldown has
+                elapsed and no other probe is in flight, else False.
+        """
+        if self._opened_at is None:
+            return True
+
+        if self._probing or \
+                time.monotonic() - self._opened_at < self._cooldown:
+            return False
+
+        self._probing = True
+        return True
+
+    def record_success(self) -> None:
+        """ Record a successful acquire, closing the breaker. """
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """ Record a failed acquire, opening the breaker at the threshold. """
+        self._failures += 1
+        self._probing = False
+
+        if self._failures >= self._threshold:
+            self._opened_at = time.monotonic()
+
+    def release_probe(self) -> None:
+        """
+        Give up an acquire attempt that neither succeeded nor failed, such
+        as one that was cancelled, freeing the half-open probe slot without
+        counting a failure.
+        """
+        self._probing = False
+
+
+# Breaker shared by every route using with_db_connection.
+_BREAKER = AcquireCircuitBreaker()
+
+
+def _service_unavailable() -> quart.Response:
+    """
+    Build the response returned when no database connection can be had.
+
+    Returns:
+        quart.Response: A JSON error response with a 503 status code.
+    """
+    return quart.Response(_SERVICE_UNAVAILABLE_BODY,
+                          status=HTTPStatus.SERVICE_UNAVAILABLE,
+                          mimetype="application/json")
+
+
+def breaker_is_open() -> bool:
+    """
+    Check whether database connection acquisition is currently failing.
+
+    Returns:
+        bool: True while the shared circuit breaker is open or half-open,
+            optional database work should be skipped, else False.
+    """
+    return _BREAKER.is_open
+
+
+def current_db() -> typing.Optional[asyncpg.Connection]:
+    """
+    Get the pooled database connection held by the current route handler.
+
+    Returns:
+        asyncpg.Connection | None: The connection acquired by
+            ``with_db_connection``, or ``None`` outside a wrapped handler.
+    """
+    return _DB_CV.get()
+
+
+def with_db_connection(handler: typing.Callable[..., typing.Awaitable]
+                       ) -> typing.Callable[..., typing.Awaitable]:
+    """
+    Decorator that holds a pooled database connection only while a route
+    handler runs.
+
+    A connection is acquired from the application's connection pool
+    (``app.db_pool``) when the handler is entered and exposed to it through
+    ``current_db()``. It is released as soon as the handler returns or raises,
+    so the connection is not held while Quart finalises the response.
+
+    Acquisition is guarded by a circuit breaker, while the database is
+    failing requests are rejected immediately rather than queueing on the
+    pool.
+
+    Handlers marked with ``route_not_using_db`` are returned unchanged, the
+    flag is resolved once here at registration time rather than per request.
+
+    Args:
+        handler (Callable): The async route handler to wrap.
+
+    Returns:
+        Callable: The wrapped handler. If no connection becomes free within
+            the acquire timeout, or the circuit breaker is open, it returns a
+            JSON error response with a 503 status code without calling the
+            handler.
+    """
+    if getattr(handler, "_not_using_db", False):
+        return handler
+
+    @functools.wraps(handler)
+    async def wrapper(*args, **kwargs):
+        app = quart.current_app
+        pool = app.db_pool
+        timeout = getattr(app, "db_acquire_timeout", DB_ACQUIRE_TIMEOUT)
+
+        if not _BREAKER.allow():
+            return _service_unavailable()
+
+        try:
+            connection = await pool.acquire(timeout=timeout)
+
+        except asyncio.TimeoutError:
+            _BREAKER.record_failure()
+            return _service_unavailable()
+
+        except _ACQUIRE_FAILURES:
+            _BREAKER.record_failure()
+            raise
+
+        except BaseException:
+            # Cancelled (client disconnected, server shutting down) or some
+            # other error unrelated to the database's health.
+            _BREAKER.release_probe()
+            raise
+
+        _BREAKER.record_success()
+
+        token = _DB_CV.set(connection)
+
+        try:
+            return await handler(*args, **kwargs)
+
+        finally:
+            _DB_CV.reset(token)
+            await pool.release(connection)
+
+    return wrapper
@@ -0,0 +1,60 @@
+"""
+Copyright (C) 2025  WeaveFeed Development Team
+SPDX-License-Identifier: AGPL-3.0-or-later
+
+This file is part of WeaveFeed. See the LICENSE file in the project
+root for full license details.
+"""
+import typing
+import orjson
+from quart.json.provider import DefaultJSONProvider
+
+# orjson is a compiled extension whose members pylint cannot introspect.
+# pylint: disable=no-member
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Quart JSON provider that encodes and decodes with orjson.
+
+    Honours the default provider's ``sort_keys`` setting and indented output
+    in debug mode, types orjson cannot serialise natively fall back to the
+    default provider's handling. Dates and datetimes are passed to that
+    fallback too, so they keep Quart's HTTP date format rather than orjson's
+    ISO 8601.
+    """
+
+    def dumps(self, obj: typing.Any, **kwargs: typing.Any) -> str:
+        """
+        Serialise an object to a JSON string.
+
+        Args:
+            obj (Any): The object to serialise.
+            **kwargs: ``json.dumps`` style arguments, only ``sort_keys`` and
+                ``indent`` are honoured.
+
+        Returns:
+            str: The JSON document.
+        """
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s: typing.Union[str, bytes], **kwargs: typing.Any
+              ) -> typing.Any:
+        """
+        Deserialise a JSON document.
+
+        Args:
+            s (str | bytes): The JSON document.
+
+        Returns:
+            Any: The decoded object.
+        """
+        return orjson.loads(s)
@@ -0,0 +1,93 @@
+"""
+Copyright (C) 2025  WeaveFeed Development Team
+SPDX-License-Identifier: AGPL-3.0-or-later
+
+This file is part of WeaveFeed. See the LICENSE file in the project
+root for full license details.
+"""
+import bcrypt
+
+# bcrypt only uses the first 72 bytes of a password. Older backends dropped
+# the rest silently, bcrypt 5 raises instead, so truncate explicitly to keep
+# hashes stored by either verifying the same way.
+BCRYPT_MAX_PASSWORD_BYTES: int = 72
+
+# Work factor (log2 rounds) new hashes are created with.
+DEFAULT_ROUNDS: int = 12
+
+
+def _encode(password: str) -> bytes:
+    """
+    Encode a password to the bytes bcrypt works on.
+
+    Args:
+        password (str): The plaintext password.
+
+    Returns:
+        bytes: The UTF-8 encoded password, truncated to the bcrypt limit.
+    """
+    return password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+
+
+def hash_password(password: str, rounds: int = DEFAULT_ROUNDS) -> str:
+    """
+    Hash a password with bcrypt.
+
+    This calls the bcrypt package's native (Rust) backend directly. The
+    output is a standard ``$2b$`` hash, so hashes created earlier through
+    passlib still verify.
+
+    Args:
+        password (str): The plaintext password.
+        rounds (int, optional): bcrypt work factor. Defaults to
+            DEFAULT_ROUNDS.
+
+    Returns:
+        str: The bcrypt hash of the password.
+    """
+    return bcrypt.hashpw(_encode(password),
+                         bcrypt.gensalt(rounds)).decode("ascii")
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    """
+    Check a password against a stored bcrypt hash.
+
+    Args:
+        password (str): The plaintext password to check.
+        password_hash (str): The stored bcrypt hash.
+
+    Returns:
+        bool: True if the password matches the hash, else False.
+    """
+    try:
+        return bcrypt.checkpw(_encode(password),
+                              password_hash.encode("ascii"))
+
+    except ValueError:
+        # Malformed hash
+        return False
+
+
+def needs_rehash(password_hash: str, rounds: int = DEFAULT_ROUNDS) -> bool:
+    """
+    Check whether a stored hash was created with a lower work factor.
+
+    The work factor is part of the ``$2b$<rounds>$...`` hash itself, so
+    nothing needs storing alongside it.
+
+    Args:
+        password_hash (str): The stored bcrypt hash.
+        rounds (int, optional): The work factor hashes should have. Defaults
+            to DEFAULT_ROUNDS.
+
+    Returns:
+        bool: True if the hash uses fewer rounds, False if it does not or it
+            is not a bcrypt hash.
+    """
+    parts = password_hash.split("$")
+
+    if len(parts) < 4 or not parts[2].isdigit():
+        return False
+
+    return int(parts[2]) < rounds
@@ -6,8 +6,8 @@ This file is part of WeaveFeed. See the LICENSE file in the project
 root for full license details.
 """
 import asyncio
-import os
 from quart import Quart
+from weavefeed_common.fatal_startup_error import FatalStartupError
 from application import Application
 
 # Quart application instance
@@ -15,29 +15,35 @@ app = Quart(__name__)
 
 SERVICE_APP: Application = Application(app)
 
-async def cancel_background_tasks():
+async def cancel_background_tasks(timeout: float = 5.0):
     """
     Cancel and await the application's background task, if it exists.
 
     This function looks for a task stored on the global ``app`` object
     under the attribute ``background_task``. If found, it cancels the task
-    and safely awaits its termination. Any ``asyncio.CancelledError``
-    raised during cancellation is suppressed.
+    and waits up to ``timeout`` seconds for it to finish. A task that
+    ignores the cancellation is abandoned with a warning rather than
+    blocking shutdown indefinitely.
 
     This is typically called during application shutdown to ensure that
     background operations are gracefully stopped.
 
-    Raises:
-        asyncio.CancelledError: Only if the cancellation is not suppressed
-            (unexpected behavior).
+    Args:
+        timeout (float, optional): Seconds to wait for the task to finish
+            after cancelling it. Defaults to 5.0.
     """
     task = getattr(app, "background_task", None)
     if task:
         task.cancel()
-        try:
-            await task
-        except asyncio.CancelledError:
-            pass
+
+        # asyncio.wait() does not re-cancel or wait again on timeout, unlike
+        # asyncio.wait_for(), so the wait is strictly bounded.
+        _, pending = await asyncio.wait({task}, timeout=timeout)
+
+        if pending:
+            SERVICE_APP.logger.warning(
+                "Background task did not stop within %.1fs, abandoning it",
+                timeout)
 
 
 @app.before_serving
@@ -45,11 +51,18 @@ async def startup() -> None:
     """
     Code executed before Quart has begun serving http requests.
 
+    Raising here makes Quart report a failed lifespan startup, so the server
+    exits through its normal shutdown path and queued log records are
+    flushed.
+
     returns:
         None
+
+    Raises:
+        FatalStartupError: If the microservice failed to initialise.
     """
     if not await SERVICE_APP.initialise():
-        os._exit(1)
+        raise FatalStartupError("Gateway microservice failed to initialise")
 
     app.background_task = asyncio.create_task(SERVICE_APP.run())
 
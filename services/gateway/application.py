@@ -5,12 +5,13 @@ SPDX-License-Identifier: AGPL-3.0-or-later
 This file is part of WeaveFeed. See the LICENSE file in the project
 root for full license details.
 """
-import asyncio
 import logging
 import os
 import sys
 from weavefeed_common import __version__
-from weavefeed_common.configuration.configuration import Configuration
+from weavefeed_common.async_logging import install_async_logging
+from weavefeed_common.configuration.configuration import \
+    BOOL_FALSE_VALUES, BOOL_TRUE_VALUES, Configuration
 from weavefeed_common.base_microservice_application \
     import BaseMicroserviceApplication
 from weavefeed_common.logging_consts import LOGGING_DATETIME_FORMAT_STRING, \
@@ -35,23 +36,20 @@ class Application(BaseMicroserviceApplication):
         self._logger.setLevel(LOGGING_DEFAULT_LOG_LEVEL)
         self._logger.propagate = True
         self._logger.addHandler(console_stream)
+        self._log_listener = install_async_logging(self._logger)
 
     async def _initialise(self) -> bool:
         self._logger.info("WeaveFeed Gateway Microservice %s",
                           __version__)
         self._logger.info("https://github.com/SwatKat1977/WeaveFeed")
 
-        # Acceptable values
-        truths: set = {"1", "true", "yes", "on"}
-        falses: set = {"0", "false", "no", "off"}
-
         config_file = os.getenv("WEAVEFEED_GATEWAY_CONFIG_FILE", None)
         raw_required = os.getenv("WEAVEFEED_GATEWAY_CONFIG_FILE_REQUIRED",
                                  "false").strip().lower()
 
-        if raw_required in truths:
+        if raw_required in BOOL_TRUE_VALUES:
             config_file_required: bool = True
-        elif raw_required in falses:
+        elif raw_required in BOOL_FALSE_VALUES:
             config_file_required: bool = False
         else:
             print(f"[FATAL ERROR] Invalid value for "
@@ -64,11 +62,11 @@ class Application(BaseMicroserviceApplication):
             return False
 
         self._config = Configuration()
-        self._config.configure(CONFIGURATION_LAYOUT,
-                               config_file,
-                               config_file_required)
 
         try:
+            self._config.configure(CONFIGURATION_LAYOUT,
+                                   config_file,
+                                   config_file_required)
             self._config.process_config()
 
         except ValueError as ex:
@@ -81,9 +79,9 @@ class Application(BaseMicroserviceApplication):
 
         return True
 
-    async def _main_loop(self) -> None:
+    async def _main_loop(self) -> bool:
         """ Abstract method for main application. """
-        await asyncio.sleep(0.1)
+        return False
 
     async def _shutdown(self):
         """ Shutdown logic. """
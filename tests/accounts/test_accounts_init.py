@@ -0,0 +1,148 @@
+import asyncio
+import unittest
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
+import services.accounts as accounts
+from weavefeed_common.fatal_startup_error import FatalStartupError
+
+
+class TestCreateDbPool(unittest.IsolatedAsyncioTestCase):
+    async def test_returns_pool_on_first_attempt(self):
+        fake_pool = MagicMock()
+        with patch.object(accounts.asyncpg, "create_pool", new=AsyncMock(return_value=fake_pool)) as mock_create, \
+             patch.object(accounts.asyncio, "sleep", new=AsyncMock()) as mock_sleep:
+            pool = await accounts.create_db_pool(accounts.DatabaseConfig)
+
+        self.assertIs(pool, fake_pool)
+        mock_create.assert_awaited_once()
+        mock_sleep.assert_not_awaited()
+
+    async def test_progress_goes_to_supplied_logger(self):
+        logger = MagicMock()
+        create_pool = AsyncMock(side_effect=[OSError("down"), MagicMock()])
+
+        with patch.object(accounts.asyncpg, "create_pool", new=create_pool), \
+             patch.object(accounts.asyncio, "sleep", new=AsyncMock()), \
+             patch("builtins.print") as mock_print:
+            await accounts.create_db_pool(accounts.DatabaseConfig, logger=logger)
+
+        mock_print.assert_not_called()
+        logger.critical.assert_called_once_with(
+            "Database network/connection error: %s", ANY)
+        self.assertEqual(logger.info.call_count, 2)  # retrying + connected
+
+    async def test_retries_with_capped_full_jitter(self):
+        fake_pool = MagicMock()
+        create_pool = AsyncMock(side_effect=[OSError("down")] * 3 + [fake_pool])
+
+        with patch.object(accounts.asyncpg, "create_pool", new=create_pool), \
+             patch.object(accounts.asyncio, "sleep", new=AsyncMock()) as mock_sleep, \
+             patch.object(accounts.random, "uniform", return_value=0.25) as mock_uniform:
+            pool = await accounts.create_db_pool(accounts.DatabaseConfig,
+                                                 retries=5,
+                                                 base_delay=1.0,
+                                                 max_delay=3.0)
+
+        self.assertIs(pool, fake_pool)
+        # Backoff ceilings 1, 2, 4 -> capped at 3, each fully jittered
+        self.assertEqual([c.args for c in mock_uniform.call_args_list],
+                         [(0, 1.0), (0, 2.0), (0, 3.0)])
+        self.assertEqual(mock_sleep.await_count, 3)
+        mock_sleep.assert_awaited_with(0.25)
+
+    async def test_raises_when_retries_exhausted(self):
+        create_pool = AsyncMock(side_effect=OSError("down"))
+
+        with patch.object(accounts.asyncpg, "create_pool", new=create_pool), \
+             patch.object(accounts.asyncio, "sleep", new=AsyncMock()), \
+             patch.object(accounts, "cancel_background_tasks", new=AsyncMock()) as mock_cancel:
+            with self.assertRaises(FatalStartupError):
+                await accounts.create_db_pool(accounts.DatabaseConfig, retries=2)
+
+        self.assertEqual(create_pool.await_count, 2)
+        mock_cancel.assert_awaited_once()
+
+
+class TestCancelBackgroundTasks(unittest.IsolatedAsyncioTestCase):
+    async def asyncTearDown(self):
+        if hasattr(accounts.app, "background_task"):
+            del accounts.app.background_task
+
+    async def test_cancels_running_task(self):
+        task = asyncio.create_task(asyncio.sleep(60))
+        accounts.app.background_task = task
+
+        await accounts.cancel_background_tasks()
+
+        self.assertTrue(task.cancelled())
+
+    async def test_abandons_task_ignoring_cancellation(self):
+        release = asyncio.Event()
+
+        async def stubborn():
+            while not release.is_set():
+                try:
+                    await release.wait()
+                except asyncio.CancelledError:
+                    pass
+
+        task = asyncio.create_task(stubborn())
+        await asyncio.sleep(0)
+        accounts.app.background_task = task
+
+        with patch.object(accounts.SERVICE_APP.logger, "warning") as mock_warning:
+            await accounts.cancel_background_tasks(timeout=0.01)
+
+        self.assertFalse(task.done())
+        mock_warning.assert_called_once()
+
+        release.set()
+        await task
+
+
+class TestStartupShutdown(unittest.IsolatedAsyncioTestCase):
+    async def asyncTearDown(self):
+        for attr in ("db_pool", "background_task"):
+            if hasattr(accounts.app, attr):
+                delattr(accounts.app, attr)
+
+    async def test_startup_raises_fatal_error_when_initialise_fails(self):
+        with patch.object(accounts.SERVICE_APP, "initialise", new=AsyncMock(return_value=False)), \
+             patch.object(accounts, "create_db_pool", new=AsyncMock()) as mock_create:
+            with self.assertRaises(FatalStartupError):
+                await accounts.startup()
+
+        mock_create.assert_not_awaited()
+
+    async def test_shutdown_closes_pool(self):
+        pool = MagicMock(close=AsyncMock())
+        accounts.app.db_pool = pool
+
+        await accounts.shutdown()
+
+        pool.close.assert_awaited_once()
+        pool.terminate.assert_not_called()
+
+    async def test_shutdown_cancels_rehashes_before_closing_pool(self):
+        calls = []
+        pool = MagicMock(close=AsyncMock(
+            side_effect=lambda: calls.append("close")))
+        accounts.app.db_pool = pool
+
+        async def cancel_rehash_tasks():
+            calls.append("cancel_rehash_tasks")
+
+        with patch.object(accounts, "cancel_rehash_tasks",
+                          new=cancel_rehash_tasks):
+            await accounts.shutdown()
+
+        self.assertEqual(calls, ["cancel_rehash_tasks", "close"])
+
+    async def test_shutdown_terminates_pool_that_will_not_close(self):
+        pool = MagicMock()
+        accounts.app.db_pool = pool
+
+        with patch.object(accounts.asyncio, "wait_for",
+                          new=AsyncMock(side_effect=asyncio.TimeoutError)):
+            await accounts.shutdown()
+
+        pool.terminate.assert_called_once()
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime, timezone
 from http import HTTPStatus
 import json
@@ -6,19 +7,22 @@ import sys
 import unittest
 import uuid
 from unittest.mock import AsyncMock, patch, MagicMock
-from quart import jsonify, Quart, Response, g
+from quart import Quart, Response
 from api.auth_api import create_blueprint
+from db_connection import _DB_CV
 from services.accounts.api.auth_api_view import AuthApiView
 import api.auth_api_view as auth_api_view
-from passlib.hash import bcrypt
+
+# Configured once, adding a handler per test would stack them up on the
+# shared logger. Debug output is only captured by the tests that check it.
+TEST_LOGGER = logging.getLogger("test_logger")
+TEST_LOGGER.setLevel(logging.WARNING)
+TEST_LOGGER.addHandler(logging.NullHandler())
 
 
 class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
     async def asyncSetUp(self):
-        # Create a test logger
-        self.logger = logging.getLogger("test_logger")
-        self.logger.setLevel(logging.DEBUG)
-        self.logger.addHandler(logging.NullHandler())
+        self.logger = TEST_LOGGER
         self.auth_view = AuthApiView(self.logger)
 
     @patch("api.auth_api.AuthApiView")
@@ -32,6 +36,7 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
 
         # Create the Quart app and register the blueprint
         app = Quart(__name__)
+        app.db_pool = MagicMock(acquire=AsyncMock(), release=AsyncMock())
         blueprint = create_blueprint(self.logger)
         app.register_blueprint(blueprint, url_prefix="/auth")
 
@@ -56,28 +61,22 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
         mock_view_instance.signup_password = AsyncMock(return_value="done")
         mock_auth_view_cls.return_value = mock_view_instance
 
-        # Capture logs
-        log_stream = []
-        class ListHandler(logging.Handler):
-            def emit(self, record):
-                log_stream.append(record.getMessage())
-
-        handler = ListHandler()
-        self.logger.addHandler(handler)
-
         app = Quart(__name__)
-        blueprint = create_blueprint(self.logger)
+        app.db_pool = MagicMock(acquire=AsyncMock(), release=AsyncMock())
+
+        # Capture logs, only this test needs debug output
+        with self.assertLogs(self.logger, level=logging.DEBUG) as logs:
+            blueprint = create_blueprint(self.logger)
         app.register_blueprint(blueprint, url_prefix="/auth")
 
         test_client = app.test_client()
         await test_client.post("/auth/signup_password")
 
         # Check debug logs
+        log_stream = [record.getMessage() for record in logs.records]
         self.assertIn("Registering Auth API routes:", log_stream)
         self.assertIn("=> /auth/signup_password [POST]", log_stream)
 
-        self.logger.removeHandler(handler)
-
     # ---------- signup_password ----------
 
     async def test_signup_password_validation_error(self):
@@ -89,7 +88,7 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
         async with app.test_request_context(
             "/signup_password", method="POST", json={}
         ):
-            g.db = mock_db
+            _DB_CV.set(mock_db)
             resp, status = await self.auth_view.signup_password()
 
         self.assertEqual(status, HTTPStatus.BAD_REQUEST)
@@ -98,40 +97,41 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
 
     @patch.object(AuthApiView, "_create_user", new_callable=AsyncMock)
     async def test_signup_password_conflict_existing_user(self, mock_create_user):
-        # DB returns an existing row -> 409, and _create_user NOT called
+        # Insert hits an existing username/email -> 409
         app = Quart(__name__)
+        mock_create_user.return_value = None
         mock_db = MagicMock()
-        mock_db.fetchrow = AsyncMock(return_value={"id": "something"})
+        mock_db.fetchrow = AsyncMock()
 
         payload = {"username": "alice", "email": "a@example.com", "password": "pw123"}
 
         async with app.test_request_context(
             "/signup_password", method="POST", json=payload
         ):
-            g.db = mock_db
+            _DB_CV.set(mock_db)
             resp, status = await self.auth_view.signup_password()
 
         self.assertEqual(status, HTTPStatus.CONFLICT)
         data = await resp.get_json()
         self.assertEqual(data, {"error": "User already exists"})
-        mock_create_user.assert_not_called()
+        mock_create_user.assert_awaited_once_with("alice", "a@example.com", "pw123")
+        mock_db.fetchrow.assert_not_awaited()
 
     @patch.object(AuthApiView, "_create_user", new_callable=AsyncMock)
     async def test_signup_password_success(self, mock_create_user):
-        # DB finds no existing -> create -> 201, returns full payload
+        # Insert succeeds -> 201, returns full payload
         app = Quart(__name__)
         created_id = uuid.uuid4()
         mock_create_user.return_value = created_id
 
         mock_db = MagicMock()
-        mock_db.fetchrow = AsyncMock(return_value=None)
 
         payload = {"username": "alice", "email": "a@example.com", "password": "pw123"}
 
         async with app.test_request_context(
             "/signup_password", method="POST", json=payload
         ):
-            g.db = mock_db
+            _DB_CV.set(mock_db)
             resp, status = await self.auth_view.signup_password()
 
         self.assertEqual(status, HTTPStatus.CREATED)
@@ -153,12 +153,12 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
         # Missing required fields -> pydantic ValidationError -> 400
         app = Quart(__name__)
         mock_db = MagicMock()
-        mock_db.fetchrow = AsyncMock()
+        mock_db.fetchval = AsyncMock()
 
         async with app.test_request_context(
             "/signup/google", method="POST", json={}
         ):
-            g.db = mock_db
+            _DB_CV.set(mock_db)
             resp, status = await self.auth_view.signup_google()
 
         self.assertEqual(status, HTTPStatus.BAD_REQUEST)
@@ -170,7 +170,7 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
         # Provider already linked -> 409, _create_user NOT called
         app = Quart(__name__)
         mock_db = MagicMock()
-        mock_db.fetchrow = AsyncMock(return_value={"user_id": "u123"})
+        mock_db.fetchval = AsyncMock(return_value=uuid.uuid4())
 
         payload = {
             "provider_uid": "g-uid-1",
@@ -182,7 +182,7 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
         async with app.test_request_context(
             "/signup/google", method="POST", json=payload
         ):
-            g.db = mock_db
+            _DB_CV.set(mock_db)
             resp, status = await self.auth_view.signup_google()
 
         self.assertEqual(status, HTTPStatus.CONFLICT)
@@ -190,15 +190,13 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(data, {"error": "Account already linked"})
         mock_create_user.assert_not_called()
 
-    patch.object(AuthApiView, "_create_user", new_callable=AsyncMock)
-
-    @patch.object(AuthApiView, "_create_user", new_callable=AsyncMock)
+    @patch.object(AuthApiView, "_signup_oauth_atomic", new_callable=AsyncMock)
     async def test_signup_google_success_fallback_email(self, mock_create_user):
         app = Quart(__name__)
         mock_create_user.return_value = uuid.uuid4()
 
         mock_db = MagicMock()
-        mock_db.fetchrow = AsyncMock(return_value=None)
+        mock_db.fetchval = AsyncMock(return_value=None)
 
         payload = {
             "provider_uid": "abc123",
@@ -208,7 +206,7 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
         }
 
         async with app.test_request_context("/signup/google", method="POST", json=payload):
-            g.db = mock_db
+            _DB_CV.set(mock_db)
             resp, status = await self.auth_view.signup_google()
 
         self.assertEqual(status, HTTPStatus.CREATED)
@@ -218,30 +216,24 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
         # Assert _create_user was awaited once
         mock_create_user.assert_awaited_once()
 
-        # Get the awaited args robustly across Python versions
-        call = mock_create_user.await_args
-        try:
-            # Python 3.11+: await_args is a Call with .args/.kwargs
-            kwargs = call.kwargs
-        except AttributeError:
-            # Older: await_args is a tuple (args, kwargs)
-            _, kwargs = call
+        kwargs = mock_create_user.await_args.kwargs
 
         # All parameters were passed as kwargs
         self.assertEqual(kwargs["username"], "google_abc123")
         self.assertEqual(kwargs["email"], "abc123@googleuser.fake")
         self.assertFalse(kwargs.get("email_verified", False))
-        # password omitted (treated as None)
-        self.assertTrue("password" not in kwargs or kwargs["password"] is None)
-
-
+        # Provider link is created in the same call
+        self.assertEqual(kwargs["provider"], "google")
+        self.assertEqual(kwargs["provider_uid"], "abc123")
+        self.assertEqual(kwargs["access_token"], "aaa")
+        self.assertIsNone(kwargs["refresh_token"])
 
     async def test_signup_google_success_with_verified_email(self):
         app = Quart(__name__)
 
         # async DB mocks
         mock_db = MagicMock()
-        mock_db.fetchrow = AsyncMock(return_value=None)
+        mock_db.fetchval = AsyncMock(return_value=None)
         mock_db.execute = AsyncMock()
 
         # Resolve the EXACT module your instance was created from
@@ -253,10 +245,13 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
                 for k, v in data.items():
                     setattr(self, k, v)
 
-        with patch.object(sut_mod, "OAuthSignupRequest") as mock_oauth_model, \
-                patch.object(sut_mod.AuthApiView, "_create_user",
+            @classmethod
+            def model_validate_json(cls, raw):
+                return cls(**json.loads(raw))
+
+        with patch.object(sut_mod, "OAuthSignupRequest", DummyOAuth), \
+                patch.object(sut_mod.AuthApiView, "_signup_oauth_atomic",
                              new_callable=AsyncMock) as mock_create_user:
-            mock_oauth_model.side_effect = lambda **kw: DummyOAuth(**kw)
             mock_create_user.return_value = uuid.uuid4()
 
             payload = {
@@ -269,7 +264,7 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
             }
 
             async with app.test_request_context("/signup/google", method="POST", json=payload):
-                g.db = mock_db
+                _DB_CV.set(mock_db)
                 resp, status = await self.auth_view.signup_google()
 
         # Assertions
@@ -280,25 +275,48 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
         mock_create_user.assert_awaited_once()
 
         # _create_user was called with kwargs only
-        call = mock_create_user.await_args
-        kwargs = call.kwargs if hasattr(call, "kwargs") else call[1]
+        kwargs = mock_create_user.await_args.kwargs
         self.assertEqual(kwargs["username"], "google_xyz789")
         self.assertEqual(kwargs["email"], "verified@example.com")
         self.assertTrue(kwargs["email_verified"])
-        self.assertTrue("password" not in kwargs or kwargs["password"] is None)
+        self.assertEqual(kwargs["refresh_token"], "ref")
+
+    async def test_signup_oauth_atomic_single_statement(self):
+        app = Quart(__name__)
+        user_id = uuid.uuid4()
+        mock_db = MagicMock()
+        mock_db.fetchval = AsyncMock(return_value=user_id)
+        mock_db.execute = AsyncMock()
+
+        async with app.test_request_context("/x", method="POST"):
+            _DB_CV.set(mock_db)
+            returned_id = await self.auth_view._signup_oauth_atomic(
+                "google_abc", "abc@googleuser.fake", False, "google", "abc",
+                "tok", None, None)
+
+        self.assertEqual(returned_id, user_id)
+        mock_db.fetchval.assert_awaited_once()
+        mock_db.execute.assert_not_awaited()
+
+        args = mock_db.fetchval.await_args.args
+        self.assertIn("INSERT INTO users", args[0])
+        self.assertIn("INSERT INTO auth_providers", args[0])
+        self.assertEqual(args[1:], ("google_abc", "abc@googleuser.fake", False,
+                                    "google", "abc", "tok", None, None))
 
     async def test_create_user_without_password_unverified(self):
         app = Quart(__name__)
         # Arrange
         mock_db = MagicMock()
-        mock_db.execute = AsyncMock()
+        created_id = uuid.uuid4()
+        mock_db.fetchval = AsyncMock(return_value=created_id)
         username = "nopw_user"
         email = "nopw@example.com"
 
-        with patch.object(auth_api_view.bcrypt, "hash") as mock_hashpw:
+        with patch.object(auth_api_view.password_hasher, "hash_password") as mock_hashpw:
             # Act
             async with app.test_request_context("/x", method="POST"):
-                g.db = mock_db
+                _DB_CV.set(mock_db)
                 returned_id = await self.auth_view._create_user(
                     username=username,
                     email=email,
@@ -309,44 +327,41 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
         # Assert: bcrypt should NOT be called when no password is provided
         mock_hashpw.assert_not_called()
 
-        # DB execute was awaited once
-        mock_db.execute.assert_awaited_once()
-        call = mock_db.execute.await_args
-        args = call.args if hasattr(call, "args") else call[0]
+        # DB insert was awaited once
+        mock_db.fetchval.assert_awaited_once()
+        args = mock_db.fetchval.await_args.args
 
         # SQL string sanity check (don’t match the whole string to avoid brittleness)
         self.assertIn("INSERT INTO users", args[0])
+        self.assertIn("ON CONFLICT DO NOTHING", args[0])
 
         # Arg positions:
-        # 0 = SQL, 1 = user_id, 2 = username, 3 = email, 4 = password_hash, 5 = email_is_verified, 6 = timestamp
-        user_id_arg = args[1]
-        self.assertIsInstance(user_id_arg, uuid.UUID)
-        self.assertEqual(returned_id, user_id_arg)
+        # 0 = SQL, 1 = username, 2 = email, 3 = password_hash, 4 = email_is_verified
+        # (the id and timestamps are generated by the database)
+        self.assertEqual(returned_id, created_id)
 
-        self.assertEqual(args[2], username)
-        self.assertEqual(args[3], email)
-        self.assertIsNone(args[4])                 # password_hash is None
-        self.assertEqual(args[5], False)         # email_verified -> "FALSE"
-
-        ts = args[6]
-        self.assertIsInstance(ts, datetime)
-        self.assertEqual(ts.tzinfo, timezone.utc)  # timestamp is timezone-aware UTC
+        self.assertEqual(args[1], username)
+        self.assertEqual(args[2], email)
+        self.assertIsNone(args[3])                 # password_hash is None
+        self.assertEqual(args[4], False)         # email_verified -> "FALSE"
+        self.assertEqual(len(args), 5)
 
     async def test_create_user_with_password_verified(self):
         app = Quart(__name__)
         # Arrange
         mock_db = MagicMock()
-        mock_db.execute = AsyncMock()
+        created_id = uuid.uuid4()
+        mock_db.fetchval = AsyncMock(return_value=created_id)
         username = "pw_user"
         email = "pw@example.com"
         password = "s3cr3t"
 
         # Make bcrypt deterministic & fast
-        with patch.object(auth_api_view.bcrypt, "hash", return_value=b"hashedpw") as mock_hashpw:
+        with patch.object(auth_api_view.password_hasher, "hash_password", return_value=b"hashedpw") as mock_hashpw:
 
             # Act
             async with app.test_request_context("/x", method="POST"):
-                g.db = mock_db
+                _DB_CV.set(mock_db)
                 returned_id = await self.auth_view._create_user(
                     username=username,
                     email=email,
@@ -357,29 +372,23 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
         # Assert bcrypt usage
         mock_hashpw.assert_called_once()
         # hashpw called with password bytes and salt bytes
-        args_hash = mock_hashpw.call_args.args if hasattr(mock_hashpw.call_args, "args") else mock_hashpw.call_args[0]
+        args_hash = mock_hashpw.call_args.args
         self.assertEqual(args_hash[0], password)
 
-        # DB execute was awaited once
-        mock_db.execute.assert_awaited_once()
-        call = mock_db.execute.await_args
-        args = call.args if hasattr(call, "args") else call[0]
+        # DB insert was awaited once
+        mock_db.fetchval.assert_awaited_once()
+        args = mock_db.fetchval.await_args.args
 
         # SQL check
         self.assertIn("INSERT INTO users", args[0])
 
-        user_id_arg = args[1]
-        self.assertIsInstance(user_id_arg, uuid.UUID)
-        self.assertEqual(returned_id, user_id_arg)
-
-        self.assertEqual(args[2], username)
-        self.assertEqual(args[3], email)
-        self.assertEqual(args[4], b"hashedpw")
-        self.assertEqual(args[5], True)
+        self.assertEqual(returned_id, created_id)
 
-        ts = args[6]
-        self.assertIsInstance(ts, datetime)
-        self.assertEqual(ts.tzinfo, timezone.utc)
+        self.assertEqual(args[1], username)
+        self.assertEqual(args[2], email)
+        self.assertEqual(args[3], b"hashedpw")
+        self.assertEqual(args[4], True)
+        self.assertEqual(len(args), 5)
 
     async def test_create_auth_provider_with_tokens_and_expiry(self):
         app = Quart(__name__)
@@ -398,7 +407,7 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
 
         # Act
         async with app.test_request_context("/x", method="POST"):
-            g.db = mock_db
+            _DB_CV.set(mock_db)
             await self.auth_view._create_auth_provider(
                 user_id=user_id,
                 provider=provider,
@@ -410,26 +419,23 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
 
         # Assert DB was awaited once with expected positional args
         mock_db.execute.assert_awaited_once()
-        call = mock_db.execute.await_args
-        args = call.args if hasattr(call, "args") else call[0]
+        args = mock_db.execute.await_args.args
 
         # args layout:
         # 0 = SQL
-        # 1 = id (new uuid), 2 = user_id, 3 = provider, 4 = provider_uid,
-        # 5 = access_token, 6 = refresh_token, 7 = expires_at, 8 = timestamp (UTC)
+        # 1 = user_id, 2 = provider, 3 = provider_uid,
+        # 4 = access_token, 5 = refresh_token, 6 = expires_at
+        # (the id and timestamps are generated by the database)
         self.assertIn("INSERT INTO auth_providers", args[0])
 
-        self.assertIsInstance(args[1], uuid.UUID)         # generated id
-        self.assertEqual(args[2], user_id)
-        self.assertEqual(args[3], provider)
-        self.assertEqual(args[4], provider_uid)
-        self.assertEqual(args[5], access_token)
-        self.assertEqual(args[6], refresh_token)
-        self.assertEqual(args[7], expires_at)
+        self.assertEqual(args[1], user_id)
+        self.assertEqual(args[2], provider)
+        self.assertEqual(args[3], provider_uid)
+        self.assertEqual(args[4], access_token)
+        self.assertEqual(args[5], refresh_token)
+        self.assertEqual(args[6], expires_at)
 
-        ts = args[8]
-        self.assertIsInstance(ts, datetime)
-        self.assertEqual(ts.tzinfo, timezone.utc)
+        self.assertEqual(len(args), 7)
 
     async def test_create_auth_provider_with_none_refresh_and_expiry(self):
         app = Quart(__name__)
@@ -447,7 +453,7 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
 
         # Act
         async with app.test_request_context("/x", method="POST"):
-            g.db = mock_db
+            _DB_CV.set(mock_db)
             await self.auth_view._create_auth_provider(
                 user_id=user_id,
                 provider=provider,
@@ -459,21 +465,16 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
 
         # Assert DB awaited with the correct args (including Nones)
         mock_db.execute.assert_awaited_once()
-        call = mock_db.execute.await_args
-        args = call.args if hasattr(call, "args") else call[0]
+        args = mock_db.execute.await_args.args
 
         self.assertIn("INSERT INTO auth_providers", args[0])
-        self.assertIsInstance(args[1], uuid.UUID)         # new id
-        self.assertEqual(args[2], user_id)
-        self.assertEqual(args[3], provider)
-        self.assertEqual(args[4], provider_uid)
-        self.assertEqual(args[5], access_token)
-        self.assertIsNone(args[6])                        # refresh_token None
-        self.assertIsNone(args[7])                        # expires_at None
-
-        ts = args[8]
-        self.assertIsInstance(ts, datetime)
-        self.assertEqual(ts.tzinfo, timezone.utc)
+        self.assertEqual(args[1], user_id)
+        self.assertEqual(args[2], provider)
+        self.assertEqual(args[3], provider_uid)
+        self.assertEqual(args[4], access_token)
+        self.assertIsNone(args[5])                        # refresh_token None
+        self.assertIsNone(args[6])                        # expires_at None
+        self.assertEqual(len(args), 7)                    # id/timestamps by DB
 
     async def test_login_password_invalid_json_body(self):
         """Should return 400 if request JSON is invalid"""
@@ -488,7 +489,34 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
             self.assertEqual(status, HTTPStatus.BAD_REQUEST)
             self.assertIn("error", (await response.get_json()))
 
-    async def test_login_password_user_not_found(self):
+    async def test_login_password_malformed_json_body(self):
+        """Should return 400 if the body is not valid JSON"""
+        app = Quart(__name__)
+
+        async with app.test_request_context(
+            path="/auth/login_password",
+            method="POST",
+            data=b"{not json",
+        ):
+            response, status = await self.auth_view.login_password()
+            self.assertEqual(status, HTTPStatus.BAD_REQUEST)
+            self.assertIn("error", (await response.get_json()))
+
+    async def test_login_password_non_string_password(self):
+        """Should return 400 if a field is present but not a string"""
+        app = Quart(__name__)
+
+        async with app.test_request_context(
+            path="/auth/login_password",
+            method="POST",
+            json={"username_or_email": "bob", "password": 1234},
+        ):
+            response, status = await self.auth_view.login_password()
+            self.assertEqual(status, HTTPStatus.BAD_REQUEST)
+            self.assertIn("password", (await response.get_json())["error"])
+
+    @patch("services.accounts.api.auth_api_view.password_hasher.verify_password", return_value=False)
+    async def test_login_password_user_not_found(self, mock_verify):
         """Should return 401 if no user exists"""
         app = Quart(__name__)
         fake_db = AsyncMock()
@@ -499,11 +527,36 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
             method="POST",
             json={"username_or_email": "bob", "password": "secret"},
         ):
-            g.db = fake_db
+            _DB_CV.set(fake_db)
             response, status = await self.auth_view.login_password()
             self.assertEqual(status, HTTPStatus.UNAUTHORIZED)
             self.assertIn("Invalid credentials", (await response.get_json())["error"])
 
+        # A dummy hash is still verified so unknown users cost the same time
+        mock_verify.assert_called_once_with("secret", auth_api_view._DUMMY_HASH)
+
+    @patch("services.accounts.api.auth_api_view.password_hasher.verify_password", return_value=True)
+    async def test_login_password_user_without_password(self, mock_verify):
+        """Should return 401 for an external sign-in only account"""
+        app = Quart(__name__)
+        fake_db = AsyncMock()
+        fake_db.fetchrow.return_value = (
+            uuid.uuid4(), "google_abc", "abc@googleuser.fake", None, True, True)
+
+        async with app.test_request_context(
+            path="/auth/login_password",
+            method="POST",
+            json={"username_or_email": "google_abc", "password": "secret"},
+        ):
+            _DB_CV.set(fake_db)
+            response, status = await self.auth_view.login_password()
+            self.assertEqual(status, HTTPStatus.UNAUTHORIZED)
+            self.assertIn("Invalid credentials", (await response.get_json())["error"])
+
+        # Same bcrypt work as an unknown user, so it cannot be told apart
+        mock_verify.assert_called_once_with("secret", auth_api_view._DUMMY_HASH)
+        fake_db.execute.assert_not_awaited()
+
     async def test_login_password_inactive_user(self):
         """Should return 403 if user is inactive"""
         app = Quart(__name__)
@@ -519,19 +572,19 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
             "is_verified": False,
         }
         fake_db = AsyncMock()
-        fake_db.fetchrow.return_value = fake_user
+        fake_db.fetchrow.return_value = tuple(fake_user.values())
 
         async with app.test_request_context(
             path="/auth/login_password",
             method="POST",
             json={"username_or_email": "bob", "password": "secret"},
         ):
-            g.db = fake_db
+            _DB_CV.set(fake_db)
             response, status = await self.auth_view.login_password()
             self.assertEqual(status, HTTPStatus.FORBIDDEN)
             self.assertIn("Account disabled", (await response.get_json())["error"])
 
-    @patch("services.accounts.api.auth_api_view.bcrypt.verify", return_value=False)
+    @patch("services.accounts.api.auth_api_view.password_hasher.verify_password", return_value=False)
     async def test_login_password_wrong_password(self, mock_verify):
         """Should return 401 if password does not match"""
         app = Quart(__name__)
@@ -545,21 +598,21 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
             "is_verified": False,
         }
         fake_db = AsyncMock()
-        fake_db.fetchrow.return_value = fake_user
+        fake_db.fetchrow.return_value = tuple(fake_user.values())
 
         async with app.test_request_context(
             path="/auth/login_password",
             method="POST",
             json={"username_or_email": "bob", "password": "wrong"},
         ):
-            g.db = fake_db
+            _DB_CV.set(fake_db)
             response, status = await self.auth_view.login_password()
 
             self.assertEqual(status, HTTPStatus.UNAUTHORIZED)
             body = await response.get_json()
             self.assertIn("Invalid credentials", body["error"])
 
-    @patch("services.accounts.api.auth_api_view.bcrypt.verify", return_value=True)
+    @patch("services.accounts.api.auth_api_view.password_hasher.verify_password", return_value=True)
     async def test_login_password_successful_login(self, mock_verify):
         """Should return 200 and user details if login succeeds"""
         app = Quart(__name__)
@@ -574,7 +627,7 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
             "is_verified": True,
         }
         fake_db = AsyncMock()
-        fake_db.fetchrow.return_value = fake_user
+        fake_db.fetchrow.return_value = tuple(fake_user.values())
         fake_db.execute.return_value = None  # simulate update last_login
 
         async with app.test_request_context(
@@ -582,7 +635,7 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
             method="POST",
             json={"username_or_email": "bob", "password": "secret"},
         ):
-            g.db = fake_db
+            _DB_CV.set(fake_db)
             response, status = await self.auth_view.login_password()
 
             self.assertEqual(status, HTTPStatus.OK)
@@ -594,7 +647,11 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
             self.assertTrue(body["is_verified"])
             self.assertEqual(body["message"], "Login successful")
 
-    @patch("services.accounts.api.auth_api_view.bcrypt.verify")
+        # last_login is stamped by the database, only the id is bound
+        fake_db.execute.assert_awaited_once_with(
+            "UPDATE users SET last_login=now() WHERE id=$1", user_id)
+
+    @patch("services.accounts.api.auth_api_view.password_hasher.verify_password")
     async def test_login_password_invalid_request_body(self, mock_verify):
         """Should return 400 if request body does not match PasswordLoginRequest"""
         app = Quart(__name__)
@@ -606,10 +663,137 @@ class TestCreateBlueprint(unittest.IsolatedAsyncioTestCase):
                 method="POST",
                 json={"username_or_email": "bob"},  # ❌ missing "password"
         ):
-            g.db = fake_db
+            _DB_CV.set(fake_db)
             response, status = await self.auth_view.login_password()
 
             self.assertEqual(status, HTTPStatus.BAD_REQUEST)
             body = await response.get_json()
             self.assertIn("error", body)
             self.assertIn("password", body["error"])  # pydantic error mentions the missing field
+
+
+class TestAdaptiveHashCost(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        # Built from the module the assertions below inspect, it is also
+        # imported as services.accounts.api.auth_api_view above.
+        self.auth_view = auth_api_view.AuthApiView(logging.getLogger("test"))
+
+    async def test_default_rounds_when_workers_free(self):
+        with patch.object(auth_api_view.password_hasher, "hash_password",
+                          return_value="h") as mock_hash:
+            await self.auth_view._hash_password("pw")
+
+        mock_hash.assert_called_once_with(
+            "pw", auth_api_view.password_hasher.DEFAULT_ROUNDS)
+        self.assertEqual(self.auth_view._inflight_hashes, 0)
+
+    async def test_burst_rounds_when_workers_busy(self):
+        self.auth_view._inflight_hashes = auth_api_view._HASH_WORKERS
+
+        with patch.object(auth_api_view.password_hasher, "hash_password",
+                          return_value="h") as mock_hash:
+            await self.auth_view._hash_password("pw")
+
+        mock_hash.assert_called_once_with(
+            "pw", auth_api_view._BURST_HASH_ROUNDS)
+
+    async def test_verification_counts_as_inflight(self):
+        inflight = []
+
+        def fake_verify(password, password_hash):
+            inflight.append(self.auth_view._inflight_hashes)
+            return True
+
+        with patch.object(auth_api_view.password_hasher, "verify_password",
+                          new=fake_verify):
+            self.assertTrue(
+                await self.auth_view._verify_password("pw", "hash"))
+
+        self.assertEqual(inflight, [1])
+        self.assertEqual(self.auth_view._inflight_hashes, 0)
+
+    async def test_rehash_uses_default_rounds_under_load(self):
+        self.auth_view._inflight_hashes = auth_api_view._HASH_WORKERS
+        pool = MagicMock()
+        acquire_cm = MagicMock()
+        acquire_cm.__aenter__ = AsyncMock(return_value=AsyncMock())
+        acquire_cm.__aexit__ = AsyncMock(return_value=False)
+        pool.acquire.return_value = acquire_cm
+
+        with patch.object(auth_api_view.password_hasher, "hash_password",
+                          return_value="newhash") as mock_hash:
+            self.auth_view._schedule_rehash(pool, 1.0, uuid.uuid4(),
+                                            "oldhash", "secret")
+            await asyncio.gather(*auth_api_view._REHASH_TASKS)
+
+        mock_hash.assert_called_once_with(
+            "secret", auth_api_view.password_hasher.DEFAULT_ROUNDS)
+
+    @patch("services.accounts.api.auth_api_view.password_hasher.verify_password", return_value=True)
+    async def test_login_upgrades_low_cost_hash(self, mock_verify):
+        app = Quart(__name__)
+        user_id = uuid.uuid4()
+        connection = AsyncMock()
+        acquire_cm = MagicMock()
+        acquire_cm.__aenter__ = AsyncMock(return_value=connection)
+        acquire_cm.__aexit__ = AsyncMock(return_value=False)
+        app.db_pool = MagicMock()
+        app.db_pool.acquire.return_value = acquire_cm
+
+        fake_db = AsyncMock()
+        fake_db.fetchrow.return_value = (
+            user_id, "bob", "bob@example.com", "$2b$10$" + "a" * 53, True, True)
+
+        with patch.object(auth_api_view.password_hasher, "hash_password",
+                          return_value="newhash"):
+            async with app.test_request_context(
+                path="/auth/login_password",
+                method="POST",
+                json={"username_or_email": "bob", "password": "secret"},
+            ):
+                _DB_CV.set(fake_db)
+                _, status = await self.auth_view.login_password()
+
+            self.assertEqual(status, HTTPStatus.OK)
+            await asyncio.gather(*auth_api_view._REHASH_TASKS)
+
+        app.db_pool.acquire.assert_called_once_with(
+            timeout=auth_api_view.DB_ACQUIRE_TIMEOUT)
+        # Only replaces the hash that was verified
+        connection.execute.assert_awaited_once_with(
+            auth_api_view._SQL_UPDATE_PASSWORD_HASH, user_id, "newhash",
+            "$2b$10$" + "a" * 53)
+
+    async def test_rehash_failure_is_logged_not_raised(self):
+        pool = MagicMock()
+        pool.acquire.side_effect = auth_api_view.asyncpg.InterfaceError(
+            "pool is closing")
+
+        with patch.object(auth_api_view.password_hasher, "hash_password",
+                          return_value="newhash"), \
+                patch.object(self.auth_view._logger, "warning") as mock_warning:
+            self.auth_view._schedule_rehash(pool, 1.0, uuid.uuid4(),
+                                            "oldhash", "secret")
+            await asyncio.gather(*auth_api_view._REHASH_TASKS)
+
+        mock_warning.assert_called_once()
+
+    async def test_cancel_rehash_tasks_stops_running_rehash(self):
+        pool = MagicMock()
+        started = asyncio.Event()
+
+        async def slow_hash(password, rounds=None):
+            started.set()
+            await asyncio.sleep(60)
+
+        with patch.object(self.auth_view, "_hash_password", new=slow_hash):
+            self.auth_view._schedule_rehash(pool, 1.0, uuid.uuid4(),
+                                            "oldhash", "secret")
+            task = next(iter(auth_api_view._REHASH_TASKS))
+            await started.wait()
+
+            await auth_api_view.cancel_rehash_tasks(timeout=1.0)
+
+        self.assertTrue(task.cancelled())
+        self.assertFalse(auth_api_view._REHASH_TASKS)
+        pool.acquire.assert_not_called()
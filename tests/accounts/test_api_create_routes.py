@@ -1,18 +1,21 @@
 import http
 import unittest
 import logging
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from quart import Quart, Blueprint
 import api as accounts_api
 from api import auth_api
 
+# Configured once, adding a handler per test would stack them up on the
+# shared logger. Debug output is only captured by the tests that check it.
+TEST_LOGGER = logging.getLogger("test_logger")
+TEST_LOGGER.setLevel(logging.WARNING)
+TEST_LOGGER.addHandler(logging.NullHandler())
+
+
 class TestCreateRoutes(unittest.IsolatedAsyncioTestCase):
     async def asyncSetUp(self):
-        self.logger = logging.getLogger("test_logger")
-        self.logger.setLevel(logging.DEBUG)
-        self.logger.addHandler(logging.NullHandler())
-
-        self.app = Quart(__name__)
+        self.logger = TEST_LOGGER
 
     @patch("api.create_auth_bp")  # <-- patch the alias used inside api/__init__.py
     async def test_create_routes_registers_auth_blueprint(self, mock_create_auth_bp):
@@ -52,11 +55,13 @@ class TestCreateRoutes(unittest.IsolatedAsyncioTestCase):
         mock_login_password.return_value = ("ok", http.HTTPStatus.OK)
 
         # Register the real blueprint
+        app = Quart(__name__)
+        app.db_pool = MagicMock(acquire=AsyncMock(), release=AsyncMock())
         bp = auth_api.create_blueprint(self.logger)
-        self.app.register_blueprint(bp, url_prefix="/auth")
+        app.register_blueprint(bp, url_prefix="/auth")
 
         # Act: hit the route
-        client = self.app.test_client()
+        client = app.test_client()
         response = await client.post("/auth/login_password", json={"username_or_email": "bob", "password": "secret"})
 
         # Assert
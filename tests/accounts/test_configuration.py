@@ -0,0 +1,90 @@
+import os
+import unittest
+from unittest.mock import patch
+from weavefeed_common.configuration.configuration import Configuration
+from weavefeed_common.configuration.configuration_setup import \
+    ConfigItemDataType, ConfigurationSetup, ConfigurationSetupItem
+
+
+def _configuration(layout: dict) -> Configuration:
+    config = Configuration()
+    config.configure(ConfigurationSetup(layout))
+    return config
+
+
+@patch.dict(os.environ, {}, clear=True)
+class TestConfiguration(unittest.TestCase):
+    def test_missing_required_item_raises(self):
+        config = _configuration({
+            "database": [ConfigurationSetupItem(
+                "host", ConfigItemDataType.STRING, is_required=True)],
+        })
+
+        with self.assertRaisesRegex(
+                ValueError,
+                "Config item 'database::host' is required but missing"):
+            config.process_config()
+
+    def test_default_used_for_missing_optional_item(self):
+        config = _configuration({
+            "database": [ConfigurationSetupItem(
+                "port", ConfigItemDataType.INT, default_value=5432)],
+        })
+
+        config.process_config()
+
+        self.assertEqual(config.get_entry("database", "port"), 5432)
+
+    def test_unsigned_int_rejects_negative(self):
+        config = _configuration({
+            "pool": [ConfigurationSetupItem(
+                "size", ConfigItemDataType.UNSIGNED_INT)],
+        })
+
+        with patch.dict(os.environ, {"POOL_SIZE": "-1"}):
+            with self.assertRaisesRegex(
+                    ValueError,
+                    "'pool::size' has invalid unsigned int '-1', "
+                    "minimum is 0"):
+                config.process_config()
+
+    def test_unsigned_int_accepts_zero(self):
+        config = _configuration({
+            "pool": [ConfigurationSetupItem(
+                "size", ConfigItemDataType.UNSIGNED_INT)],
+        })
+
+        with patch.dict(os.environ, {"POOL_SIZE": "0"}):
+            config.process_config()
+
+        self.assertEqual(config.get_entry("pool", "size"), 0)
+
+    def test_int_accepts_negative(self):
+        config = _configuration({
+            "pool": [ConfigurationSetupItem(
+                "offset", ConfigItemDataType.INT)],
+        })
+
+        with patch.dict(os.environ, {"POOL_OFFSET": "-3"}):
+            config.process_config()
+
+        self.assertEqual(config.get_entry("pool", "offset"), -3)
+
+    def test_unsupported_item_type_raises_on_configure(self):
+        layout = ConfigurationSetup({
+            "logging": [ConfigurationSetupItem("log_level", "string")],
+        })
+
+        with self.assertRaisesRegex(
+                ValueError,
+                "'logging::log_level' has unsupported type 'string'"):
+            Configuration().configure(layout)
+
+    def test_empty_section_is_empty_dict(self):
+        config = _configuration({"empty": []})
+
+        config.process_config()
+
+        self.assertEqual(config._config_items, {"empty": {}})
+        with self.assertRaisesRegex(ValueError, "Invalid key 'empty::x'"):
+            config.get_entry("empty", "x")
@@ -0,0 +1,195 @@
+import asyncio
+from http import HTTPStatus
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from quart import Quart
+import db_connection
+from db_connection import AcquireCircuitBreaker, DB_ACQUIRE_TIMEOUT, current_db, with_db_connection
+from weavefeed_common.route_decorators import route_not_using_db
+
+
+class TestWithDbConnection(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.connection = MagicMock()
+        self.app = Quart(__name__)
+        self.app.db_pool = MagicMock(acquire=AsyncMock(return_value=self.connection),
+                                     release=AsyncMock())
+
+        # Fresh breaker per test so state never leaks between tests
+        self.breaker = AcquireCircuitBreaker(threshold=2, cooldown=10.0)
+        breaker_patcher = patch.object(db_connection, "_BREAKER", self.breaker)
+        breaker_patcher.start()
+        self.addCleanup(breaker_patcher.stop)
+
+    async def test_connection_exposed_and_released_after_handler(self):
+        seen = {}
+
+        @with_db_connection
+        async def handler():
+            seen["db"] = current_db()
+            self.app.db_pool.release.assert_not_awaited()
+            return "ok"
+
+        async with self.app.app_context():
+            result = await handler()
+            self.assertIsNone(current_db())
+
+        self.assertEqual(result, "ok")
+        self.assertIs(seen["db"], self.connection)
+        self.app.db_pool.acquire.assert_awaited_once_with(timeout=DB_ACQUIRE_TIMEOUT)
+        self.app.db_pool.release.assert_awaited_once_with(self.connection)
+
+    async def test_connection_released_when_handler_raises(self):
+        @with_db_connection
+        async def handler():
+            raise RuntimeError("boom")
+
+        async with self.app.app_context():
+            with self.assertRaises(RuntimeError):
+                await handler()
+
+        self.app.db_pool.release.assert_awaited_once_with(self.connection)
+
+    async def test_acquire_timeout_returns_503(self):
+        self.app.db_pool.acquire.side_effect = asyncio.TimeoutError
+        handler_mock = AsyncMock()
+
+        async def handler():
+            return await handler_mock()
+
+        async with self.app.app_context():
+            response = await with_db_connection(handler)()
+
+        self.assertEqual(response.status_code, HTTPStatus.SERVICE_UNAVAILABLE)
+        self.assertEqual(await response.get_json(),
+                         {"error": "Service unavailable"})
+        handler_mock.assert_not_awaited()
+        self.app.db_pool.release.assert_not_awaited()
+
+    async def test_handler_marked_not_using_db_is_not_wrapped(self):
+        @route_not_using_db
+        async def handler():
+            return "ok"
+
+        self.assertIs(with_db_connection(handler), handler)
+        self.app.db_pool.acquire.assert_not_awaited()
+
+    async def test_acquire_uses_application_timeout(self):
+        self.app.db_acquire_timeout = 0.5
+
+        @with_db_connection
+        async def handler():
+            return "ok"
+
+        async with self.app.app_context():
+            await handler()
+
+        self.app.db_pool.acquire.assert_awaited_once_with(timeout=0.5)
+
+    async def test_open_breaker_fails_fast_without_acquiring(self):
+        self.app.db_pool.acquire.side_effect = asyncio.TimeoutError
+
+        @with_db_connection
+        async def handler():
+            return "ok"
+
+        async with self.app.app_context():
+            await handler()
+            await handler()
+            self.assertTrue(self.breaker.is_open)
+
+            response = await handler()
+
+        self.assertEqual(response.status_code, HTTPStatus.SERVICE_UNAVAILABLE)
+        self.assertEqual(self.app.db_pool.acquire.await_count, 2)
+
+    async def test_connection_error_counts_as_failure(self):
+        self.app.db_pool.acquire.side_effect = OSError("refused")
+
+        @with_db_connection
+        async def handler():
+            return "ok"
+
+        async with self.app.app_context():
+            for _ in range(2):
+                with self.assertRaises(OSError):
+                    await handler()
+
+        self.assertTrue(self.breaker.is_open)
+
+    async def test_cancelled_acquire_does_not_trip_breaker(self):
+        acquiring = asyncio.Event()
+
+        async def acquire(timeout):
+            acquiring.set()
+            await asyncio.sleep(60)
+
+        self.app.db_pool.acquire.side_effect = acquire
+
+        @with_db_connection
+        async def handler():
+            return "ok"
+
+        async with self.app.app_context():
+            for _ in range(3):
+                acquiring.clear()
+                task = asyncio.create_task(handler())
+                await acquiring.wait()
+                task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+
+        self.assertFalse(self.breaker.is_open)
+        self.assertTrue(self.breaker.allow())
+
+
+class TestAcquireCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.breaker = AcquireCircuitBreaker(threshold=2, cooldown=10.0)
+
+    def test_opens_after_threshold_failures(self):
+        with patch.object(db_connection.time, "monotonic", return_value=100.0):
+            self.breaker.record_failure()
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record_failure()
+            self.assertFalse(self.breaker.allow())
+
+    def test_success_resets_failure_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertFalse(self.breaker.is_open)
+
+    def test_half_open_lets_single_probe_through_after_cooldown(self):
+        with patch.object(db_connection.time, "monotonic", return_value=100.0):
+            self.breaker.record_failure()
+            self.breaker.record_failure()
+
+        with patch.object(db_connection.time, "monotonic", return_value=111.0):
+            self.assertTrue(self.breaker.allow())
+            self.assertFalse(self.breaker.allow())
+
+            self.breaker.record_success()
+            self.assertTrue(self.breaker.allow())
+            self.assertFalse(self.breaker.is_open)
+
+    def test_failed_probe_reopens_breaker(self):
+        with patch.object(db_connection.time, "monotonic", return_value=100.0):
+            self.breaker.record_failure()
+            self.breaker.record_failure()
+
+        with patch.object(db_connection.time, "monotonic", return_value=111.0):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record_failure()
+            self.assertFalse(self.breaker.allow())
+
+    def test_released_probe_lets_next_probe_through(self):
+        with patch.object(db_connection.time, "monotonic", return_value=100.0):
+            self.breaker.record_failure()
+            self.breaker.record_failure()
+
+        with patch.object(db_connection.time, "monotonic", return_value=111.0):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.release_probe()
+            self.assertTrue(self.breaker.is_open)
+            self.assertTrue(self.breaker.allow())
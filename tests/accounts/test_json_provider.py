@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+import json
+import unittest
+import uuid
+from quart import Quart, jsonify
+from json_provider import OrjsonProvider
+
+
+class TestOrjsonProvider(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.app = Quart(__name__)
+        self.app.json = OrjsonProvider(self.app)
+
+    def test_dumps_sorts_keys_and_serialises_uuid(self):
+        user_id = uuid.uuid4()
+        out = self.app.json.dumps({"b": 1, "a": user_id})
+        self.assertEqual(out, f'{{"a":"{user_id}","b":1}}')
+
+    def test_dumps_datetime_matches_default_provider(self):
+        when = datetime(2025, 10, 6, 9, 21, 54, tzinfo=timezone.utc)
+        self.assertEqual(self.app.json.dumps({"at": when}),
+                         '{"at":"Mon, 06 Oct 2025 09:21:54 GMT"}')
+
+    def test_loads_round_trips(self):
+        self.assertEqual(self.app.json.loads(b'{"x": [1, 2]}'), {"x": [1, 2]})
+
+    async def test_jsonify_response(self):
+        async with self.app.app_context():
+            response = jsonify({"message": "ok"})
+            self.assertEqual(response.mimetype, "application/json")
+            self.assertEqual(json.loads(await response.get_data()), {"message": "ok"})
@@ -0,0 +1,26 @@
+import unittest
+import password_hasher
+
+# Lowest bcrypt cost, these tests check behaviour rather than strength
+FAST_ROUNDS = 4
+
+
+class TestPasswordHasher(unittest.TestCase):
+    def test_hash_round_trips(self):
+        hashed = password_hasher.hash_password("s3cr3t", FAST_ROUNDS)
+        self.assertTrue(hashed.startswith("$2b$"))
+        self.assertTrue(password_hasher.verify_password("s3cr3t", hashed))
+        self.assertFalse(password_hasher.verify_password("wrong", hashed))
+
+    def test_long_password_is_truncated_not_rejected(self):
+        hashed = password_hasher.hash_password("x" * 100, FAST_ROUNDS)
+        self.assertTrue(password_hasher.verify_password("x" * 72, hashed))
+
+    def test_malformed_hash_does_not_verify(self):
+        self.assertFalse(password_hasher.verify_password("s3cr3t", "junk"))
+
+    def test_needs_rehash_compares_rounds(self):
+        hashed = password_hasher.hash_password("s3cr3t", FAST_ROUNDS)
+        self.assertTrue(password_hasher.needs_rehash(hashed))
+        self.assertFalse(password_hasher.needs_rehash(hashed, FAST_ROUNDS))
+        self.assertFalse(password_hasher.needs_rehash("fakehash"))